@@ -38,13 +38,22 @@ class WooCommerceClient:
     """
     Client for WooCommerce REST API v3.
 
-    Uses httpx for async HTTP requests to WooCommerce.
+    Uses a long-lived httpx.AsyncClient so successive requests reuse
+    keepalive connections instead of redoing the TCP/TLS handshake.
     Authenticates using HTTP Basic Auth with consumer key/secret.
 
+    Use as an async context manager (or call aclose()) to release
+    pooled connections:
+
+        async with WooCommerceClient(...) as client:
+            await client.mark_order_as_paid(order_id)
+
     Attributes:
         store_url: WooCommerce store URL
         base_url: Full API base URL ({store_url}/wp-json/wc/v3)
-        timeout: Request timeout in seconds (default: 30)
+        timeout: Read/write timeout in seconds (default: 30)
+        connect_timeout: Connection timeout in seconds (default: 1)
+        pool_timeout: Seconds to wait for a free pooled connection (default: 1)
     """
 
     def __init__(
@@ -53,6 +62,8 @@ class WooCommerceClient:
         consumer_key: str,
         consumer_secret: str,
         timeout: float = 30.0,
+        connect_timeout: float | None = 1.0,
+        pool_timeout: float | None = 1.0,
     ) -> None:
         """
         Initialize WooCommerce client with store credentials.
@@ -61,12 +72,24 @@ class WooCommerceClient:
             store_url: WooCommerce store URL (e.g., 'https://my-store.com')
             consumer_key: WooCommerce REST API consumer key (ck_xxx)
             consumer_secret: WooCommerce REST API consumer secret (cs_xxx)
-            timeout: Request timeout in seconds (default: 30)
+            timeout: Read/write timeout in seconds (default: 30)
+            connect_timeout: Connection timeout in seconds, None to disable (default: 1)
+            pool_timeout: Seconds to wait for a free pooled connection,
+                None to disable (default: 1)
         """
         self.store_url = store_url.rstrip("/")
         self.base_url = f"{self.store_url}/wp-json/wc/v3"
         self.timeout = timeout
 
+        # Fail fast on unreachable hosts or an exhausted pool instead of
+        # blocking for the full read timeout
+        self._timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=timeout,
+            write=timeout,
+            pool=pool_timeout,
+        )
+
         # HTTP Basic Auth with consumer key and secret
         self._auth = httpx.BasicAuth(consumer_key, consumer_secret)
 
@@ -77,6 +100,30 @@ class WooCommerceClient:
             "User-Agent": "VentIA/1.0 (WooCommerce API Client)",
         }
 
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=self._auth,
+            headers=self._headers,
+            http2=False,
+            timeout=self._timeout,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=60.0,
+            ),
+            verify=False,  # Many WordPress hosts have misconfigured SSL chains
+        )
+
+    async def __aenter__(self) -> "WooCommerceClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its pooled connections."""
+        await self._client.aclose()
+
     async def _request(
         self,
         method: str,
@@ -100,51 +147,41 @@ class WooCommerceClient:
             WooCommerceError: For other HTTP errors
             httpx.RequestError: For network/connection errors
         """
-        url = f"{self.base_url}{endpoint}"
+        try:
+            response = await self._client.request(
+                method=method,
+                url=endpoint,
+                json=data,
+            )
+
+            # Handle specific HTTP errors
+            if response.status_code == 401:
+                raise WooCommerceAuthError(
+                    "Invalid WooCommerce credentials",
+                    status_code=401,
+                )
 
-        async with httpx.AsyncClient(
-            http2=False,
-            timeout=self.timeout,
-            verify=False,  # Many WordPress hosts have misconfigured SSL chains
-        ) as client:
-            try:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    auth=self._auth,
-                    headers=self._headers,
-                    json=data,
-                    timeout=self.timeout,
+            if response.status_code == 404:
+                raise WooCommerceNotFoundError(
+                    f"Resource not found: {endpoint}",
+                    status_code=404,
                 )
 
-                # Handle specific HTTP errors
-                if response.status_code == 401:
-                    raise WooCommerceAuthError(
-                        "Invalid WooCommerce credentials",
-                        status_code=401,
-                    )
-
-                if response.status_code == 404:
-                    raise WooCommerceNotFoundError(
-                        f"Resource not found: {endpoint}",
-                        status_code=404,
-                    )
-
-                # Raise for other HTTP errors
-                response.raise_for_status()
-
-                return response.json()
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"WooCommerce HTTP error: {e.response.status_code} - {e}")
-                raise WooCommerceError(
-                    f"HTTP error {e.response.status_code}: {e.response.text}",
-                    status_code=e.response.status_code,
-                ) from e
-
-            except httpx.RequestError as e:
-                logger.error(f"WooCommerce request error: {e}")
-                raise
+            # Raise for other HTTP errors
+            response.raise_for_status()
+
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"WooCommerce HTTP error: {e.response.status_code} - {e}")
+            raise WooCommerceError(
+                f"HTTP error {e.response.status_code}: {e.response.text}",
+                status_code=e.response.status_code,
+            ) from e
+
+        except httpx.RequestError as e:
+            logger.error(f"WooCommerce request error: {e}")
+            raise
 
     async def get_order(self, order_id: int) -> dict[str, Any]:
         """
@@ -3,6 +3,8 @@ VentIA Backend - FastAPI application entry point.
 """
 
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 import sentry_sdk
 from fastapi import FastAPI, Request
@@ -11,6 +13,7 @@ from fastapi.responses import JSONResponse
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.services.ecommerce import ecommerce_service
 from app.services.messaging_service import MessagingClientError
 
 # Configure logging
@@ -34,6 +37,14 @@ if settings.SENTRY_DSN:
     except Exception as e:
         logger.warning("Failed to initialize Sentry: %s", e)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Release pooled e-commerce HTTP connections on shutdown."""
+    yield
+    await ecommerce_service.aclose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -43,6 +54,7 @@ app = FastAPI(
     redoc_url=f"{settings.API_V1_STR}/redoc",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     redirect_slashes=False,  # Evita 307 redirects que pierden el header Authorization
+    lifespan=lifespan,
 )
 
 # Configure CORS
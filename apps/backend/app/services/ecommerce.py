@@ -35,8 +35,58 @@ class EcommerceService:
 
     The service reads platform configuration from tenant.get_settings() and
     automatically routes to the appropriate platform client.
+
+    WooCommerce clients are kept per store so their pooled keepalive
+    connections are reused across requests. Call aclose() on application
+    shutdown to release them.
     """
 
+    def __init__(self) -> None:
+        self._woocommerce_clients: dict[
+            str, tuple[WooCommerceCredentials, WooCommerceClient]
+        ] = {}
+
+    async def get_woocommerce_client(
+        self, credentials: WooCommerceCredentials
+    ) -> WooCommerceClient:
+        """
+        Get the shared WooCommerce client for a store, creating it on first use.
+
+        Clients are keyed by store URL. If the store's key pair changed since
+        the client was created, the old client is closed and replaced.
+
+        Args:
+            credentials: WooCommerce API credentials (key and secret must be set)
+
+        Returns:
+            WooCommerceClient bound to a long-lived connection pool
+        """
+        entry = self._woocommerce_clients.get(credentials.store_url)
+        if entry is not None:
+            cached, client = entry
+            if (cached.consumer_key, cached.consumer_secret) == (
+                credentials.consumer_key,
+                credentials.consumer_secret,
+            ):
+                return client
+
+        client = WooCommerceClient(
+            store_url=credentials.store_url,
+            consumer_key=credentials.consumer_key,
+            consumer_secret=credentials.consumer_secret,
+        )
+        self._woocommerce_clients[credentials.store_url] = (credentials, client)
+        if entry is not None:
+            await entry[1].aclose()
+        return client
+
+    async def aclose(self) -> None:
+        """Close every cached WooCommerce client and its pooled connections."""
+        entries = list(self._woocommerce_clients.values())
+        self._woocommerce_clients.clear()
+        for _, client in entries:
+            await client.aclose()
+
     async def validate_order(
         self,
         db: Session,
@@ -89,7 +139,7 @@ class EcommerceService:
         shopify_order_id = None
         new_woocommerce_order_id = None
 
-        if settings.has_ecommerce and sync_enabled:
+        if platform is not None and sync_enabled:
             if platform == "shopify":
                 if order.source_platform == "shopify":
                     # Existing flow: complete draft order
@@ -202,11 +252,7 @@ class EcommerceService:
         if not credentials.consumer_key or not credentials.consumer_secret:
             raise ValueError("WooCommerce credentials not configured")
 
-        client = WooCommerceClient(
-            store_url=credentials.store_url,
-            consumer_key=credentials.consumer_key,
-            consumer_secret=credentials.consumer_secret,
-        )
+        client = await self.get_woocommerce_client(credentials)
 
         logger.info(f"Marking WooCommerce order as paid: {order.woocommerce_order_id}")
 
@@ -324,11 +370,7 @@ class EcommerceService:
         if not credentials.consumer_key or not credentials.consumer_secret:
             raise ValueError("WooCommerce credentials not configured")
 
-        client = WooCommerceClient(
-            store_url=credentials.store_url,
-            consumer_key=credentials.consumer_key,
-            consumer_secret=credentials.consumer_secret,
-        )
+        client = await self.get_woocommerce_client(credentials)
 
         # Map VentIA line items to WooCommerce format
         woo_line_items = []
@@ -432,7 +474,7 @@ class EcommerceService:
         )
 
         # Sync to e-commerce platform if configured (skip for native VentIA orders)
-        if settings.has_ecommerce and sync_enabled and order.source_platform == platform:
+        if platform is not None and sync_enabled and order.source_platform == platform:
             if platform == "shopify":
                 if not order.validado:
                     await self._cancel_shopify_draft(db, order, settings.ecommerce.shopify)
@@ -568,11 +610,7 @@ class EcommerceService:
         if not credentials.consumer_key or not credentials.consumer_secret:
             raise ValueError("WooCommerce credentials not configured")
 
-        client = WooCommerceClient(
-            store_url=credentials.store_url,
-            consumer_key=credentials.consumer_key,
-            consumer_secret=credentials.consumer_secret,
-        )
+        client = await self.get_woocommerce_client(credentials)
 
         logger.info(f"Cancelling WooCommerce order: {order.woocommerce_order_id}")
 
@@ -27,6 +27,87 @@ from app.schemas.invoice import InvoiceCreate, InvoiceResponse, InvoiceUpdate
 
 logger = logging.getLogger(__name__)
 
+# SUNAT document types (catálogo 06):
+# - 0: Sin documento (for customers without identification)
+# - 1: DNI (Documento Nacional de Identidad)
+# - 4: Carnet de extranjería
+# - 6: RUC (Registro Único de Contribuyentes)
+# - 7: Pasaporte
+# - A: Cédula diplomática de identidad
+#
+# SUNAT rules for invoice types:
+# - Factura (01): MUST have RUC (tipo_documento = "6") with 11 digits
+# - Boleta (03): Can have DNI, Sin documento, Carnet extranjería, Pasaporte, etc.
+# - NC/ND (07/08): Any type valid for Factura or Boleta, since they reference either one
+_BOLETA_DOCUMENT_TYPES = frozenset({"0", "1", "4", "6", "7", "A"})
+_NOTE_INVALID_TYPE_MSG = (
+    "Invalid cliente_tipo_documento: {doc_type}. "
+    f"Valid types: {', '.join(sorted(_BOLETA_DOCUMENT_TYPES))}."
+)
+
+# invoice_type -> (accepted cliente_tipo_documento values, error when not accepted)
+_SUNAT_DOC_TYPE_RULES: dict[str, tuple[frozenset[str], str]] = {
+    "01": (
+        frozenset({"6"}),
+        "Facturas (invoice_type=01) require RUC (cliente_tipo_documento=6) with 11 digits. "
+        "Received cliente_tipo_documento={doc_type}. "
+        "For customers without RUC, use Boleta (invoice_type=03) instead.",
+    ),
+    "03": (
+        _BOLETA_DOCUMENT_TYPES,
+        "Invalid cliente_tipo_documento for Boleta: {doc_type}. "
+        "Valid types: 0 (Sin documento), 1 (DNI), 4 (Carnet extranjería), "
+        "6 (RUC), 7 (Pasaporte), A (Cédula diplomática).",
+    ),
+    "07": (_BOLETA_DOCUMENT_TYPES, _NOTE_INVALID_TYPE_MSG),
+    "08": (_BOLETA_DOCUMENT_TYPES, _NOTE_INVALID_TYPE_MSG),
+}
+
+_NOTE_DNI_LENGTH = (8, 8, "DNI must be 8 digits. Received: {length} digits.")
+_NOTE_RUC_LENGTH = (11, 11, "RUC must be 11 digits. Received: {length} digits.")
+
+# (invoice_type, cliente_tipo_documento) -> (min length, max length, error when out of range).
+# Pairs without an entry (e.g. Boleta with "A") accept any length.
+_SUNAT_DOC_LENGTH_RULES: dict[tuple[str, str], tuple[int, int | None, str]] = {
+    ("01", "6"): (
+        11,
+        11,
+        "Facturas require RUC with 11 digits. Received: {number} ({length} digits).",
+    ),
+    ("03", "1"): (
+        8,
+        8,
+        "DNI (tipo_documento=1) must be 8 digits. Received: {number} ({length} digits).",
+    ),
+    ("03", "6"): (
+        11,
+        11,
+        "RUC (tipo_documento=6) must be 11 digits. Received: {number} ({length} digits).",
+    ),
+    ("03", "4"): (
+        8,
+        12,
+        "Carnet de extranjería (tipo_documento=4) must be between 8 and 12 characters. "
+        "Received: {number} ({length} characters).",
+    ),
+    ("03", "7"): (
+        5,
+        12,
+        "Pasaporte (tipo_documento=7) must be between 5 and 12 characters. "
+        "Received: {number} ({length} characters).",
+    ),
+    ("03", "0"): (
+        1,
+        None,
+        "Document number is required even for tipo_documento=0 (Sin documento). "
+        "Use a placeholder value like '00000000'.",
+    ),
+    ("07", "1"): _NOTE_DNI_LENGTH,
+    ("07", "6"): _NOTE_RUC_LENGTH,
+    ("08", "1"): _NOTE_DNI_LENGTH,
+    ("08", "6"): _NOTE_RUC_LENGTH,
+}
+
 
 class InvoiceService:
     """Service for managing electronic invoices (comprobantes electrónicos)."""
@@ -35,6 +116,39 @@ class InvoiceService:
         """Initialize the service with eFact client."""
         self.efact_client = EFactClient()
 
+    @staticmethod
+    def _validate_customer_document(
+        invoice_type: str, document_type: str, document_number: str
+    ) -> None:
+        """
+        Check the customer document against the SUNAT rules for the invoice type.
+
+        Args:
+            invoice_type: Invoice type (01, 03, 07, 08)
+            document_type: Customer cliente_tipo_documento (SUNAT catálogo 06)
+            document_number: Customer document number
+
+        Raises:
+            ValueError: If the document type is not accepted for the invoice type
+                or the document number has the wrong length
+        """
+        type_rule = _SUNAT_DOC_TYPE_RULES.get(invoice_type)
+        if type_rule is None:
+            return
+
+        accepted_types, type_error = type_rule
+        if document_type not in accepted_types:
+            raise ValueError(type_error.format(doc_type=document_type))
+
+        length_rule = _SUNAT_DOC_LENGTH_RULES.get((invoice_type, document_type))
+        if length_rule is None:
+            return
+
+        min_length, max_length, length_error = length_rule
+        length = len(document_number)
+        if length < min_length or (max_length is not None and length > max_length):
+            raise ValueError(length_error.format(number=document_number, length=length))
+
     def create_invoice(
         self,
         db: Session,
@@ -126,94 +240,9 @@ class InvoiceService:
             )
 
         # ===== VALIDATE DOCUMENT TYPE VS INVOICE TYPE =====
-        # SUNAT document types (catálogo 06):
-        # - 0: Sin documento (for customers without identification)
-        # - 1: DNI (Documento Nacional de Identidad)
-        # - 4: Carnet de extranjería
-        # - 6: RUC (Registro Único de Contribuyentes)
-        # - 7: Pasaporte
-        # - A: Cédula diplomática de identidad
-        
-        # SUNAT rules for invoice types:
-        # - Factura (01): MUST have RUC (tipo_documento = "6") with 11 digits
-        # - Boleta (03): Can have DNI, Sin documento, Carnet extranjería, Pasaporte, etc.
-        # - NC/ND (07/08): Follow same rules as the referenced document
-        
-        # Define valid document types per invoice type
-        VALID_DOCUMENT_TYPES_FACTURA = ["6"]  # Only RUC for Facturas
-        VALID_DOCUMENT_TYPES_BOLETA = ["0", "1", "4", "6", "7", "A"]  # Multiple types for Boletas
-        
-        # Validate based on invoice type
-        if invoice_data.invoice_type == "01":  # Factura
-            if customer_document_type not in VALID_DOCUMENT_TYPES_FACTURA:
-                raise ValueError(
-                    "Facturas (invoice_type=01) require RUC (cliente_tipo_documento=6) with 11 digits. "
-                    f"Received cliente_tipo_documento={customer_document_type}. "
-                    "For customers without RUC, use Boleta (invoice_type=03) instead."
-                )
-            # Factura must have RUC with exactly 11 digits
-            if len(customer_document_number) != 11:
-                raise ValueError(
-                    f"Facturas require RUC with 11 digits. "
-                    f"Received: {customer_document_number} ({len(customer_document_number)} digits)."
-                )
-        
-        elif invoice_data.invoice_type == "03":  # Boleta
-            if customer_document_type not in VALID_DOCUMENT_TYPES_BOLETA:
-                raise ValueError(
-                    f"Invalid cliente_tipo_documento for Boleta: {customer_document_type}. "
-                    f"Valid types: 0 (Sin documento), 1 (DNI), 4 (Carnet extranjería), "
-                    f"6 (RUC), 7 (Pasaporte), A (Cédula diplomática)."
-                )
-            
-            # Validate document number length based on type
-            if customer_document_type == "1":  # DNI
-                if len(customer_document_number) != 8:
-                    raise ValueError(
-                        f"DNI (tipo_documento=1) must be 8 digits. "
-                        f"Received: {customer_document_number} ({len(customer_document_number)} digits)."
-                    )
-            elif customer_document_type == "6":  # RUC
-                if len(customer_document_number) != 11:
-                    raise ValueError(
-                        f"RUC (tipo_documento=6) must be 11 digits. "
-                        f"Received: {customer_document_number} ({len(customer_document_number)} digits)."
-                    )
-            elif customer_document_type == "4":  # Carnet de extranjería
-                if len(customer_document_number) < 8 or len(customer_document_number) > 12:
-                    raise ValueError(
-                        f"Carnet de extranjería (tipo_documento=4) must be between 8 and 12 characters. "
-                        f"Received: {customer_document_number} ({len(customer_document_number)} characters)."
-                    )
-            elif customer_document_type == "7":  # Pasaporte
-                if len(customer_document_number) < 5 or len(customer_document_number) > 12:
-                    raise ValueError(
-                        f"Pasaporte (tipo_documento=7) must be between 5 and 12 characters. "
-                        f"Received: {customer_document_number} ({len(customer_document_number)} characters)."
-                    )
-            elif customer_document_type == "0":  # Sin documento
-                # For "sin documento", allow flexible length but minimum 1 character
-                if len(customer_document_number) < 1:
-                    raise ValueError(
-                        "Document number is required even for tipo_documento=0 (Sin documento). "
-                        "Use a placeholder value like '00000000'."
-                    )
-            # tipo_documento "A" (Cédula diplomática) - flexible length
-        
-        # For NC/ND (07/08), validate against all possible types since they reference other invoices
-        elif invoice_data.invoice_type in ("07", "08"):
-            all_valid_types = set(VALID_DOCUMENT_TYPES_FACTURA + VALID_DOCUMENT_TYPES_BOLETA)
-            if customer_document_type not in all_valid_types:
-                raise ValueError(
-                    f"Invalid cliente_tipo_documento: {customer_document_type}. "
-                    f"Valid types: {', '.join(sorted(all_valid_types))}."
-                )
-            
-            # Validate lengths for common types
-            if customer_document_type == "1" and len(customer_document_number) != 8:
-                raise ValueError(f"DNI must be 8 digits. Received: {len(customer_document_number)} digits.")
-            elif customer_document_type == "6" and len(customer_document_number) != 11:
-                raise ValueError(f"RUC must be 11 digits. Received: {len(customer_document_number)} digits.")
+        self._validate_customer_document(
+            invoice_data.invoice_type, customer_document_type, customer_document_number
+        )
 
         # Get tenant and validate it has RUC
         tenant = tenant_repository.get(db, tenant_id)
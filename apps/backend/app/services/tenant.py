@@ -566,15 +566,11 @@ class TenantService:
             return
 
         try:
-            from app.integrations.woocommerce_client import WooCommerceClient
+            from app.services.ecommerce import ecommerce_service
             from app.services.webhook_subscription_service import WebhookSubscriptionService
 
-            # Create WooCommerce client
-            woo_client = WooCommerceClient(
-                store_url=woo_credentials.store_url,
-                consumer_key=woo_credentials.consumer_key,
-                consumer_secret=woo_credentials.consumer_secret,
-            )
+            # Reuse the pooled WooCommerce client for this store
+            woo_client = await ecommerce_service.get_woocommerce_client(woo_credentials)
 
             # Subscribe to webhooks
             webhook_service = WebhookSubscriptionService(db)
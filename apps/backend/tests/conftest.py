@@ -5,6 +5,7 @@ Shared fixtures for all tests.
 import pytest
 from datetime import datetime
 from unittest.mock import MagicMock, AsyncMock, patch
+from collections.abc import Callable
 from typing import Any
 
 from sqlalchemy.orm import Session
@@ -14,6 +15,7 @@ from app.models.tenant import Tenant
 from app.models.invoice import Invoice
 from app.models.invoice_serie import InvoiceSerie
 from app.core.permissions import Role
+from app.schemas.order import LineItemBase, OrderCreate
 from app.schemas.tenant_settings import (
     TenantSettings,
     EcommerceSettings,
@@ -99,36 +101,9 @@ def mock_tenant_woocommerce() -> MagicMock:
 
 
 @pytest.fixture
-def mock_order(mock_tenant: MagicMock) -> MagicMock:
+def mock_order(make_order: Callable[..., MagicMock]) -> MagicMock:
     """Create a mock validated order."""
-    order = MagicMock(spec=Order)
-    order.id = 1
-    order.tenant_id = 1
-    order.tenant = mock_tenant
-    order.shopify_draft_order_id = "gid://shopify/DraftOrder/123456"
-    order.shopify_order_id = None
-    order.woocommerce_order_id = None
-    order.customer_email = "cliente@example.com"
-    order.customer_name = "Juan Perez"
-    order.customer_document_type = "1"  # DNI
-    order.customer_document_number = "12345678"
-    order.total_price = 118.00
-    order.currency = "PEN"
-    order.validado = True
-    order.validated_at = datetime.utcnow()
-    order.status = "Pagado"
-    order.line_items = [
-        {
-            "sku": "PROD001",
-            "product": "Producto Test",
-            "unitPrice": 118.00,
-            "quantity": 1,
-            "subtotal": 118.00,
-        }
-    ]
-    order.source_platform = "shopify"
-
-    return order
+    return make_order(validated_at=datetime.utcnow())
 
 
 @pytest.fixture
@@ -164,6 +139,82 @@ def mock_order_pending(mock_tenant: MagicMock) -> MagicMock:
     return order
 
 
+@pytest.fixture
+def make_order(mock_tenant: MagicMock) -> Callable[..., MagicMock]:
+    """
+    Return a factory for Order mocks.
+
+    Defaults describe a validated Shopify order of the mock tenant (mock_order);
+    keyword arguments override any attribute, including tenant.
+    """
+
+    def _make(**overrides: Any) -> MagicMock:
+        order = MagicMock(spec=Order)
+        order.configure_mock(
+            **{
+                "id": 1,
+                "tenant_id": 1,
+                "tenant": mock_tenant,
+                "shopify_draft_order_id": "gid://shopify/DraftOrder/123456",
+                "shopify_order_id": None,
+                "woocommerce_order_id": None,
+                "customer_email": "cliente@example.com",
+                "customer_name": "Juan Perez",
+                "customer_document_type": "1",  # DNI
+                "customer_document_number": "12345678",
+                "total_price": 118.00,
+                "currency": "PEN",
+                "validado": True,
+                "validated_at": None,
+                "status": "Pagado",
+                "line_items": [
+                    {
+                        "sku": "PROD001",
+                        "product": "Producto Test",
+                        "unitPrice": 118.00,
+                        "quantity": 1,
+                        "subtotal": 118.00,
+                    }
+                ],
+                "source_platform": "shopify",
+                **overrides,
+            }
+        )
+        return order
+
+    return _make
+
+
+@pytest.fixture(scope="session")
+def make_order_create() -> Callable[..., OrderCreate]:
+    """
+    Return a factory for OrderCreate payloads built without validation.
+
+    Defaults describe a one-item Shopify draft order; keyword arguments
+    override any field. The payloads only reach mocked repositories, so
+    model_construct is safe, and the line item is built once per session.
+    """
+    line_item = LineItemBase.model_construct(
+        sku="PROD001", product="Producto Test", unitPrice=100.00, quantity=1
+    )
+
+    def _make(**overrides: Any) -> OrderCreate:
+        return OrderCreate.model_construct(
+            **{
+                "customer_email": "cliente@example.com",
+                "customer_name": "Juan Perez",
+                "customer_document_type": "1",
+                "customer_document_number": "12345678",
+                "shopify_draft_order_id": "gid://shopify/DraftOrder/123456",
+                "line_items": [line_item],
+                "currency": "PEN",
+                **overrides,
+            }
+        )
+
+    return _make
+
+
 @pytest.fixture
 def mock_invoice() -> MagicMock:
     """Create a mock invoice."""
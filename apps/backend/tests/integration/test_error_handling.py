@@ -25,6 +25,12 @@ from app.integrations.woocommerce_client import (
 )
 
 
+def wc_response(status_code: int, **kwargs) -> httpx.Response:
+    """Build a real WooCommerce httpx.Response (raise_for_status() needs the request set)."""
+    request = httpx.Request("GET", "https://test-store.com/wp-json/wc/v3/orders/123")
+    return httpx.Response(status_code, request=request, **kwargs)
+
+
 class TestIntegrationTimeouts:
     """US-011: Tests for timeout handling in external integrations."""
 
@@ -115,16 +121,11 @@ class TestIntegrationTimeouts:
     @pytest.mark.asyncio
     async def test_woocommerce_timeout_raises_request_error(self, woocommerce_client):
         """Test: WooCommerce timeout raises RequestError."""
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.side_effect = httpx.TimeoutException(
-                "Request timed out",
-                request=MagicMock(),
-            )
-            mock_client_class.return_value = mock_client
-
+        with patch.object(
+            woocommerce_client._client,
+            "request",
+            side_effect=httpx.TimeoutException("Request timed out", request=MagicMock()),
+        ):
             with pytest.raises(httpx.RequestError):
                 await woocommerce_client.mark_order_as_paid(123)
 
@@ -174,16 +175,11 @@ class TestIntegrationTimeouts:
         self, woocommerce_client
     ):
         """Test: WooCommerce connection refused raises ConnectError."""
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.side_effect = httpx.ConnectError(
-                "Connection refused",
-                request=MagicMock(),
-            )
-            mock_client_class.return_value = mock_client
-
+        with patch.object(
+            woocommerce_client._client,
+            "request",
+            side_effect=httpx.ConnectError("Connection refused", request=MagicMock()),
+        ):
             with pytest.raises(httpx.ConnectError):
                 await woocommerce_client.mark_order_as_paid(123)
 
@@ -361,17 +357,11 @@ class TestInvalidResponses:
     @pytest.mark.asyncio
     async def test_woocommerce_empty_json_handled_gracefully(self, woocommerce_client):
         """Test: WooCommerce empty JSON response is handled."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {}  # Empty response
-
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        mock_response = wc_response(200, json={})  # Empty response
 
+        with patch.object(
+            woocommerce_client._client, "request", return_value=mock_response
+        ):
             # Should not crash with empty response
             result = await woocommerce_client.get_order(123)
             assert result == {}
@@ -379,21 +369,15 @@ class TestInvalidResponses:
     @pytest.mark.asyncio
     async def test_woocommerce_malformed_json_raises_error(self, woocommerce_client):
         """Test: WooCommerce malformed JSON raises appropriate error."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.side_effect = json.JSONDecodeError(
-            "Expecting value",
-            "not valid json",
-            0,
+        mock_response = wc_response(
+            200,
+            content=b"not valid json",
+            headers={"content-type": "application/json"},
         )
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
-
+        with patch.object(
+            woocommerce_client._client, "request", return_value=mock_response
+        ):
             with pytest.raises(json.JSONDecodeError):
                 await woocommerce_client.get_order(123)
 
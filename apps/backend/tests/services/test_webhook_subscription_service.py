@@ -21,8 +21,14 @@ def mock_db():
 
 @pytest.fixture
 def webhook_service(mock_db):
-    """Create webhook subscription service."""
-    return WebhookSubscriptionService(db=mock_db)
+    """Create webhook subscription service with its own repository mock.
+
+    The service holds the module-level repository singleton, so tests that
+    stub its methods would otherwise leak into later test files.
+    """
+    service = WebhookSubscriptionService(db=mock_db)
+    service.repository = MagicMock()
+    return service
 
 
 @pytest.fixture
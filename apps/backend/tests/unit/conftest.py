@@ -0,0 +1,16 @@
+"""
+Shared configuration for unit tests.
+"""
+
+from pathlib import Path
+
+import pytest
+
+_UNIT_DIR = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Mark every test collected under tests/unit with the unit marker."""
+    for item in items:
+        if item.path.is_relative_to(_UNIT_DIR):
+            item.add_marker(pytest.mark.unit)
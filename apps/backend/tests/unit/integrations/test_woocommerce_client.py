@@ -2,10 +2,13 @@
 US-008: Tests de Cliente WooCommerce con Mocks
 
 Tests for WooCommerceClient REST API integration with mocked HTTP responses.
+HTTP traffic is intercepted at the transport layer with respx.
 """
 
+import base64
+import json
+
 import pytest
-from unittest.mock import MagicMock, patch, AsyncMock
 
 import httpx
 
@@ -17,265 +20,207 @@ from app.integrations.woocommerce_client import (
 )
 
 
-class TestWooCommerceClientMarkOrderAsPaid:
-    """Tests for mark_order_as_paid method in WooCommerceClient."""
+ORDER_URL = "https://test-store.com/wp-json/wc/v3/orders/123"
+MISSING_ORDER_URL = "https://test-store.com/wp-json/wc/v3/orders/999"
+
+
+# Canned WooCommerce REST API v3 payloads, shaped like real store responses
+WC_ORDER_PAID = {
+    "id": 123,
+    "status": "processing",
+    "date_paid": "2024-01-15T10:30:00",
+    "total": "118.00",
+    "currency": "PEN",
+}
+
+WC_ORDER_PENDING = {
+    "id": 123,
+    "status": "pending",
+    "total": "118.00",
+    "currency": "PEN",
+    "billing": {
+        "first_name": "Juan",
+        "last_name": "Perez",
+        "email": "juan@example.com",
+    },
+    "line_items": [
+        {
+            "id": 1,
+            "name": "Test Product",
+            "quantity": 2,
+            "total": "100.00",
+        }
+    ],
+}
+
+WC_ORDER_COMPLETED = {
+    "id": 123,
+    "status": "completed",
+    "total": "118.00",
+}
+
+# Response bodies serialized once at import and reused by every test
+_JSON_HEADERS = {"content-type": "application/json"}
+_WC_ORDER_PAID_BODY = json.dumps(WC_ORDER_PAID).encode()
+_WC_ORDER_PENDING_BODY = json.dumps(WC_ORDER_PENDING).encode()
+_WC_ORDER_COMPLETED_BODY = json.dumps(WC_ORDER_COMPLETED).encode()
+
+
+def json_response(status_code: int, body: bytes) -> httpx.Response:
+    """Build a JSON httpx.Response from pre-serialized bytes."""
+    return httpx.Response(status_code, content=body, headers=_JSON_HEADERS)
+
+
+def assert_request_matches(route, *, method, url_suffix, json_body=None):
+    """Assert the route received exactly one request with this method, URL path and JSON body."""
+    assert route.call_count == 1
+    request = route.calls.last.request
+    body = json.loads(request.content) if request.content else None
+    assert (request.method, request.url.path, body) == (
+        method,
+        "/wp-json/wc/v3" + url_suffix,
+        json_body,
+    )
+
+
+class _WCClientBase:
+    """Shared client fixture for the request-level WooCommerceClient tests."""
 
     @pytest.fixture
-    def woocommerce_client(self) -> WooCommerceClient:
+    async def woocommerce_client(self):
         """Create WooCommerceClient instance with test credentials."""
-        return WooCommerceClient(
+        async with WooCommerceClient(
             store_url="https://test-store.com",
             consumer_key="ck_test_key_123",
             consumer_secret="cs_test_secret_456",
-        )
+        ) as client:
+            yield client
+
+
+class TestWooCommerceClientMarkOrderAsPaid(_WCClientBase):
+    """Tests for mark_order_as_paid method in WooCommerceClient."""
 
-    @pytest.mark.asyncio
     async def test_mark_order_as_paid_success_returns_processing_status(
-        self, woocommerce_client
+        self, woocommerce_client, respx_mock
     ):
         """Test: Successful mark_order_as_paid returns order with status='processing'."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "id": 123,
-            "status": "processing",
-            "date_paid": "2024-01-15T10:30:00",
-            "total": "118.00",
-            "currency": "PEN",
-        }
+        route = respx_mock.put(ORDER_URL).mock(
+            return_value=json_response(200, _WC_ORDER_PAID_BODY)
+        )
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        result = await woocommerce_client.mark_order_as_paid(123)
 
-            result = await woocommerce_client.mark_order_as_paid(123)
+        assert result == WC_ORDER_PAID
+        assert_request_matches(
+            route, method="PUT", url_suffix="/orders/123", json_body={"set_paid": True}
+        )
 
-            assert result["id"] == 123
-            assert result["status"] == "processing"
-            assert result["date_paid"] is not None
+    async def test_requests_use_basic_auth_credentials(self, woocommerce_client, respx_mock):
+        """Test: Requests authenticate with HTTP Basic Auth using consumer key/secret."""
+        route = respx_mock.put(ORDER_URL).mock(
+            return_value=json_response(200, _WC_ORDER_PAID_BODY)
+        )
 
-            # Verify request was made with correct data
-            call_kwargs = mock_client.request.call_args
-            assert call_kwargs.kwargs["json"] == {"set_paid": True}
+        await woocommerce_client.mark_order_as_paid(123)
 
-    @pytest.mark.asyncio
-    async def test_http_401_raises_woocommerce_auth_error(self, woocommerce_client):
-        """Test: HTTP 401 response raises WooCommerceAuthError."""
-        mock_response = MagicMock()
-        mock_response.status_code = 401
-        mock_response.text = "Invalid consumer key"
+        credentials = base64.b64encode(b"ck_test_key_123:cs_test_secret_456").decode()
+        assert route.calls.last.request.headers["Authorization"] == f"Basic {credentials}"
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+    async def test_http_401_raises_woocommerce_auth_error(self, woocommerce_client, respx_mock):
+        """Test: HTTP 401 response raises WooCommerceAuthError."""
+        respx_mock.put(ORDER_URL).mock(
+            return_value=httpx.Response(401, text="Invalid consumer key")
+        )
 
-            with pytest.raises(WooCommerceAuthError) as exc_info:
-                await woocommerce_client.mark_order_as_paid(123)
+        with pytest.raises(WooCommerceAuthError, match="credentials") as exc_info:
+            await woocommerce_client.mark_order_as_paid(123)
 
-            assert exc_info.value.status_code == 401
-            assert "Invalid" in str(exc_info.value) or "credentials" in str(exc_info.value).lower()
+        assert exc_info.value.status_code == 401
 
-    @pytest.mark.asyncio
     async def test_http_404_raises_woocommerce_not_found_error(
-        self, woocommerce_client
+        self, woocommerce_client, respx_mock
     ):
         """Test: HTTP 404 response raises WooCommerceNotFoundError."""
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.text = "Order not found"
-
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        respx_mock.put(MISSING_ORDER_URL).mock(
+            return_value=httpx.Response(404, text="Order not found")
+        )
 
-            with pytest.raises(WooCommerceNotFoundError) as exc_info:
-                await woocommerce_client.mark_order_as_paid(999)
+        with pytest.raises(WooCommerceNotFoundError, match="not found") as exc_info:
+            await woocommerce_client.mark_order_as_paid(999)
 
-            assert exc_info.value.status_code == 404
-            assert "not found" in str(exc_info.value).lower()
+        assert exc_info.value.status_code == 404
 
-    @pytest.mark.asyncio
-    async def test_http_500_raises_woocommerce_error(self, woocommerce_client):
+    async def test_http_500_raises_woocommerce_error(self, woocommerce_client, respx_mock):
         """Test: HTTP 500 response raises WooCommerceError."""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
-        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-            message="500 Server Error",
-            request=MagicMock(),
-            response=mock_response,
+        respx_mock.put(ORDER_URL).mock(
+            return_value=httpx.Response(500, text="Internal Server Error")
         )
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
-
-            with pytest.raises(WooCommerceError) as exc_info:
-                await woocommerce_client.mark_order_as_paid(123)
+        with pytest.raises(WooCommerceError) as exc_info:
+            await woocommerce_client.mark_order_as_paid(123)
 
-            assert exc_info.value.status_code == 500
+        assert exc_info.value.status_code == 500
 
-    @pytest.mark.asyncio
     async def test_http_429_rate_limit_raises_woocommerce_error_with_status(
-        self, woocommerce_client
+        self, woocommerce_client, respx_mock
     ):
         """Test: HTTP 429 rate limit response raises WooCommerceError with status_code."""
-        mock_response = MagicMock()
-        mock_response.status_code = 429
-        mock_response.text = "Rate limit exceeded"
-        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-            message="429 Too Many Requests",
-            request=MagicMock(),
-            response=mock_response,
+        respx_mock.put(ORDER_URL).mock(
+            return_value=httpx.Response(429, text="Rate limit exceeded")
         )
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        with pytest.raises(WooCommerceError) as exc_info:
+            await woocommerce_client.mark_order_as_paid(123)
 
-            with pytest.raises(WooCommerceError) as exc_info:
-                await woocommerce_client.mark_order_as_paid(123)
+        assert exc_info.value.status_code == 429
 
-            assert exc_info.value.status_code == 429
-
-    @pytest.mark.asyncio
-    async def test_timeout_raises_request_error(self, woocommerce_client):
+    async def test_timeout_raises_request_error(self, woocommerce_client, respx_mock):
         """Test: Timeout raises RequestError."""
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.side_effect = httpx.TimeoutException(
-                "Request timed out",
-                request=MagicMock(),
-            )
-            mock_client_class.return_value = mock_client
+        respx_mock.put(ORDER_URL).mock(side_effect=httpx.TimeoutException)
 
-            with pytest.raises(httpx.RequestError):
-                await woocommerce_client.mark_order_as_paid(123)
+        with pytest.raises(httpx.RequestError):
+            await woocommerce_client.mark_order_as_paid(123)
 
 
-class TestWooCommerceClientGetOrder:
+class TestWooCommerceClientGetOrder(_WCClientBase):
     """Tests for get_order method in WooCommerceClient."""
 
-    @pytest.fixture
-    def woocommerce_client(self) -> WooCommerceClient:
-        """Create WooCommerceClient instance with test credentials."""
-        return WooCommerceClient(
-            store_url="https://test-store.com",
-            consumer_key="ck_test_key_123",
-            consumer_secret="cs_test_secret_456",
-        )
-
-    @pytest.mark.asyncio
-    async def test_get_order_success_returns_order_details(self, woocommerce_client):
+    async def test_get_order_success_returns_order_details(self, woocommerce_client, respx_mock):
         """Test: Successful get_order returns order details."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "id": 123,
-            "status": "pending",
-            "total": "118.00",
-            "currency": "PEN",
-            "billing": {
-                "first_name": "Juan",
-                "last_name": "Perez",
-                "email": "juan@example.com",
-            },
-            "line_items": [
-                {
-                    "id": 1,
-                    "name": "Test Product",
-                    "quantity": 2,
-                    "total": "100.00",
-                }
-            ],
-        }
-
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        route = respx_mock.get(ORDER_URL).mock(
+            return_value=json_response(200, _WC_ORDER_PENDING_BODY)
+        )
 
-            result = await woocommerce_client.get_order(123)
+        result = await woocommerce_client.get_order(123)
 
-            assert result["id"] == 123
-            assert result["status"] == "pending"
-            assert result["total"] == "118.00"
-            assert result["billing"]["email"] == "juan@example.com"
+        assert result == WC_ORDER_PENDING
+        assert_request_matches(route, method="GET", url_suffix="/orders/123")
 
-    @pytest.mark.asyncio
-    async def test_get_order_not_found_raises_error(self, woocommerce_client):
+    async def test_get_order_not_found_raises_error(self, woocommerce_client, respx_mock):
         """Test: Order not found raises WooCommerceNotFoundError."""
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.text = "Order not found"
-
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        respx_mock.get(MISSING_ORDER_URL).mock(
+            return_value=httpx.Response(404, text="Order not found")
+        )
 
-            with pytest.raises(WooCommerceNotFoundError):
-                await woocommerce_client.get_order(999)
+        with pytest.raises(WooCommerceNotFoundError, match="not found"):
+            await woocommerce_client.get_order(999)
 
 
-class TestWooCommerceClientUpdateOrderStatus:
+class TestWooCommerceClientUpdateOrderStatus(_WCClientBase):
     """Tests for update_order_status method in WooCommerceClient."""
 
-    @pytest.fixture
-    def woocommerce_client(self) -> WooCommerceClient:
-        """Create WooCommerceClient instance with test credentials."""
-        return WooCommerceClient(
-            store_url="https://test-store.com",
-            consumer_key="ck_test_key_123",
-            consumer_secret="cs_test_secret_456",
-        )
-
-    @pytest.mark.asyncio
-    async def test_update_order_status_success(self, woocommerce_client):
+    async def test_update_order_status_success(self, woocommerce_client, respx_mock):
         """Test: Successful order status update returns updated order."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "id": 123,
-            "status": "completed",
-            "total": "118.00",
-        }
-
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.return_value = mock_response
-            mock_client_class.return_value = mock_client
-
-            result = await woocommerce_client.update_order_status(123, "completed")
+        route = respx_mock.put(ORDER_URL).mock(
+            return_value=json_response(200, _WC_ORDER_COMPLETED_BODY)
+        )
 
-            assert result["status"] == "completed"
+        result = await woocommerce_client.update_order_status(123, "completed")
 
-            # Verify request was made with correct data
-            call_kwargs = mock_client.request.call_args
-            assert call_kwargs.kwargs["json"] == {"status": "completed"}
+        assert result == WC_ORDER_COMPLETED
+        assert_request_matches(
+            route, method="PUT", url_suffix="/orders/123", json_body={"status": "completed"}
+        )
 
 
 class TestWooCommerceClientConfiguration:
@@ -323,50 +268,61 @@ class TestWooCommerceClientConfiguration:
 
         assert client.timeout == 60.0
 
+    def test_default_timeouts_split_connect_and_read(self):
+        """Test: Connect/pool timeouts fail fast while read/write use the configured timeout."""
+        client = WooCommerceClient(
+            store_url="https://my-store.com",
+            consumer_key="ck_key",
+            consumer_secret="cs_secret",
+        )
 
-class TestWooCommerceClientNetworkErrors:
-    """Tests for network error handling in WooCommerceClient."""
+        assert client._client.timeout == httpx.Timeout(
+            connect=1.0, read=30.0, write=30.0, pool=1.0
+        )
 
-    @pytest.fixture
-    def woocommerce_client(self) -> WooCommerceClient:
-        """Create WooCommerceClient instance with test credentials."""
-        return WooCommerceClient(
-            store_url="https://test-store.com",
-            consumer_key="ck_test_key_123",
-            consumer_secret="cs_test_secret_456",
+    def test_connect_and_pool_timeouts_can_be_disabled(self):
+        """Test: Connect/pool timeouts can be unset independently of read timeout."""
+        client = WooCommerceClient(
+            store_url="https://my-store.com",
+            consumer_key="ck_key",
+            consumer_secret="cs_secret",
+            timeout=120.0,
+            connect_timeout=None,
+            pool_timeout=None,
+        )
+
+        assert client._client.timeout == httpx.Timeout(
+            connect=None, read=120.0, write=120.0, pool=None
         )
 
-    @pytest.mark.asyncio
-    async def test_connection_error_is_propagated(self, woocommerce_client):
+    async def test_context_manager_closes_http_client(self):
+        """Test: Exiting the async context closes the pooled HTTP client."""
+        async with WooCommerceClient(
+            store_url="https://my-store.com",
+            consumer_key="ck_key",
+            consumer_secret="cs_secret",
+        ) as client:
+            assert client._client.is_closed is False
+
+        assert client._client.is_closed is True
+
+
+class TestWooCommerceClientNetworkErrors(_WCClientBase):
+    """Tests for network error handling in WooCommerceClient."""
+
+    async def test_connection_error_is_propagated(self, woocommerce_client, respx_mock):
         """Test: Connection errors are propagated."""
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.side_effect = httpx.ConnectError(
-                "Connection refused",
-                request=MagicMock(),
-            )
-            mock_client_class.return_value = mock_client
-
-            with pytest.raises(httpx.ConnectError):
-                await woocommerce_client.mark_order_as_paid(123)
-
-    @pytest.mark.asyncio
-    async def test_request_error_is_propagated(self, woocommerce_client):
+        respx_mock.put(ORDER_URL).mock(side_effect=httpx.ConnectError)
+
+        with pytest.raises(httpx.ConnectError):
+            await woocommerce_client.mark_order_as_paid(123)
+
+    async def test_request_error_is_propagated(self, woocommerce_client, respx_mock):
         """Test: Generic request errors are propagated."""
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.request.side_effect = httpx.RequestError(
-                "Network error",
-                request=MagicMock(),
-            )
-            mock_client_class.return_value = mock_client
-
-            with pytest.raises(httpx.RequestError):
-                await woocommerce_client.mark_order_as_paid(123)
+        respx_mock.put(ORDER_URL).mock(side_effect=httpx.RequestError)
+
+        with pytest.raises(httpx.RequestError):
+            await woocommerce_client.mark_order_as_paid(123)
 
 
 class TestWooCommerceExceptions:
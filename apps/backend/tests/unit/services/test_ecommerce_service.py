@@ -5,9 +5,11 @@ Tests for EcommerceService platform coherence validations.
 """
 
 import pytest
+from collections.abc import AsyncIterator
 from datetime import datetime
 from unittest.mock import MagicMock, patch, AsyncMock
 
+from app.integrations.woocommerce_client import WooCommerceClient
 from app.services.ecommerce import EcommerceService
 from app.schemas.tenant_settings import (
     TenantSettings,
@@ -17,109 +19,117 @@ from app.schemas.tenant_settings import (
 )
 
 
+# Fixed timestamp for orders that are already validated
+_FROZEN_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+# Canned tenant settings, validated once at import. Tests only read them.
+SHOPIFY_SETTINGS = TenantSettings(
+    ecommerce=EcommerceSettings(
+        sync_on_validation=True,
+        shopify=ShopifyCredentials(
+            store_url="https://test.myshopify.com",
+            access_token="shpat_test",
+            api_version="2024-01",
+        ),
+    )
+)
+
+SHOPIFY_SETTINGS_NO_SYNC = SHOPIFY_SETTINGS.model_copy(
+    update={
+        "ecommerce": SHOPIFY_SETTINGS.ecommerce.model_copy(update={"sync_on_validation": False})
+    }
+)
+
+SHOPIFY_SETTINGS_NO_TOKEN = TenantSettings(
+    ecommerce=EcommerceSettings(
+        sync_on_validation=True,
+        shopify=ShopifyCredentials(
+            store_url="https://test.myshopify.com",
+            access_token=None,
+        ),
+    )
+)
+
+WOOCOMMERCE_SETTINGS_NO_CREDENTIALS = TenantSettings(
+    ecommerce=EcommerceSettings(
+        sync_on_validation=True,
+        woocommerce=WooCommerceCredentials(
+            store_url="https://test-woo.com",
+            consumer_key=None,
+            consumer_secret=None,
+        ),
+    )
+)
+
+NO_ECOMMERCE_SETTINGS = TenantSettings(ecommerce=None)
+
+# Overrides for the shared make_order factory, whose default is a validated Shopify order
+_PENDING = {"validado": False, "validated_at": None, "status": "Pendiente"}
+_NATIVE = {"source_platform": None, "shopify_draft_order_id": None}
+_WOOCOMMERCE = {
+    "source_platform": "woocommerce",
+    "shopify_draft_order_id": None,
+    "woocommerce_order_id": 456,
+}
+
+WOOCOMMERCE_CREDENTIALS = WooCommerceCredentials(
+    store_url="https://test-woo.com",
+    consumer_key="ck_test",
+    consumer_secret="cs_test",
+)
+
+
+@pytest.fixture
+async def ecommerce_service() -> AsyncIterator[EcommerceService]:
+    """Create EcommerceService instance and close any WooCommerce clients it opened."""
+    service = EcommerceService()
+    yield service
+    await service.aclose()
+
+
 class TestEcommerceServicePlatformCoherence:
     """Tests for platform coherence validations in EcommerceService."""
 
-    @pytest.fixture
-    def ecommerce_service(self) -> EcommerceService:
-        """Create EcommerceService instance."""
-        return EcommerceService()
-
-    @pytest.fixture
-    def mock_order_shopify(self, mock_tenant):
-        """Create order with Shopify source."""
-        order = MagicMock()
-        order.id = 1
-        order.tenant_id = 1
-        order.tenant = mock_tenant
-        order.shopify_draft_order_id = "gid://shopify/DraftOrder/123"
-        order.woocommerce_order_id = None
-        order.validado = False
-        order.validated_at = None
-        order.source_platform = "shopify"
-        return order
-
-    @pytest.fixture
-    def mock_order_woocommerce(self, mock_tenant_woocommerce):
-        """Create order with WooCommerce source."""
-        order = MagicMock()
-        order.id = 2
-        order.tenant_id = 2
-        order.tenant = mock_tenant_woocommerce
-        order.shopify_draft_order_id = None
-        order.woocommerce_order_id = 456
-        order.validado = False
-        order.validated_at = None
-        order.source_platform = "woocommerce"
-        return order
-
-    @pytest.fixture
-    def mock_order_no_platform(self, mock_tenant):
-        """Create order without any platform ID."""
-        order = MagicMock()
-        order.id = 3
-        order.tenant_id = 1
-        order.tenant = mock_tenant
-        order.shopify_draft_order_id = None
-        order.woocommerce_order_id = None
-        order.validado = False
-        order.validated_at = None
-        order.source_platform = None
-        return order
-
     # ========================================
     # Shopify Platform Coherence
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_shopify_native_order_attempts_create_paid_order(
-        self, ecommerce_service, mock_db, mock_order_no_platform, mock_tenant
+        self, ecommerce_service, make_order, mock_db, mock_tenant
     ):
         """Test: Native VentIA order with Shopify tenant attempts to create paid order in Shopify."""
-        mock_order_no_platform.tenant = mock_tenant
-        mock_order_no_platform.source_platform = None
+        order = make_order(tenant=mock_tenant, **_PENDING, **_NATIVE)
 
         # Should fail at token retrieval (no OAuth credentials in mock), not at draft_order_id check
-        with pytest.raises(ValueError) as exc_info:
+        with pytest.raises(ValueError, match="Shopify"):
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_no_platform,
+                order=order,
             )
 
-        error_msg = str(exc_info.value)
-        assert "Shopify" in error_msg
-
-    @pytest.mark.asyncio
     async def test_shopify_order_with_woocommerce_tenant_creates_woo_order(
-        self, ecommerce_service, mock_db, mock_order_shopify, mock_tenant_woocommerce
+        self, ecommerce_service, make_order, mock_db, mock_tenant_woocommerce
     ):
         """Test: Shopify-origin order with WooCommerce tenant tries to create WooCommerce order."""
-        mock_order_shopify.tenant = mock_tenant_woocommerce
-        mock_order_shopify.source_platform = "shopify"
+        order = make_order(tenant=mock_tenant_woocommerce, **_PENDING)
 
         # source_platform != tenant platform, so it tries _create_and_pay_woocommerce
         with pytest.raises((ValueError, TypeError)):
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_shopify,
+                order=order,
             )
 
     # ========================================
     # WooCommerce Platform Coherence
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_woocommerce_native_order_attempts_create_order(
-        self, ecommerce_service, mock_db, mock_tenant_woocommerce
+        self, ecommerce_service, make_order, mock_db, mock_tenant_woocommerce
     ):
         """Test: Native VentIA order with WooCommerce tenant attempts to create WooCommerce order."""
-        order = MagicMock()
-        order.id = 1
-        order.tenant = mock_tenant_woocommerce
-        order.validado = False
-        order.shopify_draft_order_id = None
-        order.woocommerce_order_id = None
-        order.source_platform = None
+        order = make_order(tenant=mock_tenant_woocommerce, **_PENDING, **_NATIVE)
 
         # Should attempt to create order in WooCommerce (not fail at woocommerce_order_id check)
         with pytest.raises((ValueError, TypeError)):
@@ -128,70 +138,46 @@ class TestEcommerceServicePlatformCoherence:
                 order=order,
             )
 
-    @pytest.mark.asyncio
     async def test_woocommerce_order_with_shopify_tenant_fails(
-        self, ecommerce_service, mock_db, mock_order_woocommerce, mock_tenant
+        self, ecommerce_service, make_order, mock_db, mock_tenant
     ):
         """Test: WooCommerce order with Shopify-configured tenant fails."""
-        mock_order_woocommerce.tenant = mock_tenant
-        mock_order_woocommerce.source_platform = "woocommerce"
+        order = make_order(tenant=mock_tenant, **_PENDING, **_WOOCOMMERCE)
 
-        with pytest.raises(ValueError) as exc_info:
+        with pytest.raises(ValueError, match="Shopify"):
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_woocommerce,
+                order=order,
             )
 
-        error_msg = str(exc_info.value)
-        assert "Shopify" in error_msg
-
     # ========================================
     # Already Validated Orders
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_already_validated_order_raises_error(
-        self, ecommerce_service, mock_db, mock_order_shopify
+        self, ecommerce_service, make_order, mock_db, mock_tenant
     ):
         """Test: Order with validado=True cannot be validated again."""
-        mock_order_shopify.validado = True
-        mock_order_shopify.validated_at = datetime.utcnow()
+        order = make_order(tenant=mock_tenant, validated_at=_FROZEN_NOW)
 
-        with pytest.raises(ValueError) as exc_info:
+        with pytest.raises(ValueError, match="already been validated"):
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_shopify,
+                order=order,
             )
 
-        error_msg = str(exc_info.value)
-        assert "already been validated" in error_msg
-
     # ========================================
     # Successful Validation Without Sync
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_validation_without_sync_updates_local_only(
-        self, ecommerce_service, mock_db, mock_tenant
+        self, ecommerce_service, make_order, mock_db, mock_tenant
     ):
         """Test: Validation with sync_on_validation=False works without external calls."""
         # Configure tenant without sync
-        mock_tenant.get_settings.return_value = TenantSettings(
-            ecommerce=EcommerceSettings(
-                sync_on_validation=False,  # Disabled
-                shopify=ShopifyCredentials(
-                    store_url="https://test.myshopify.com",
-                    access_token="shpat_test",
-                ),
-            )
-        )
+        mock_tenant.get_settings.return_value = SHOPIFY_SETTINGS_NO_SYNC
 
-        order = MagicMock()
-        order.id = 1
-        order.tenant = mock_tenant
-        order.validado = False
-        order.shopify_draft_order_id = "gid://shopify/DraftOrder/123"
-        order.source_platform = "shopify"
+        order = make_order(tenant=mock_tenant, **_PENDING)
 
         with patch("app.services.ecommerce.order_repository") as mock_repo:
             mock_repo.update.return_value = order
@@ -215,23 +201,22 @@ class TestEcommerceServicePlatformCoherence:
     # Successful Validation With State Update
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_validation_updates_state_correctly(
-        self, ecommerce_service, mock_db, mock_order_shopify, mock_tenant
+        self, ecommerce_service, make_order, mock_db, mock_tenant
     ):
         """Test: Validation updates validado=True, status='Pagado', validated_at."""
-        mock_order_shopify.tenant = mock_tenant
+        order = make_order(tenant=mock_tenant, **_PENDING)
 
         # Mock Shopify client success
         with patch("app.services.ecommerce.order_repository") as mock_repo, \
              patch.object(ecommerce_service, "_sync_shopify", new_callable=AsyncMock) as mock_sync:
 
             mock_sync.return_value = "gid://shopify/Order/789"
-            mock_repo.update.return_value = mock_order_shopify
+            mock_repo.update.return_value = order
 
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_shopify,
+                order=order,
             )
 
             # Verify update was called with correct data
@@ -248,76 +233,47 @@ class TestEcommerceServicePlatformCoherence:
     # Missing Credentials
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_shopify_without_access_token_raises_error(
-        self, ecommerce_service, mock_db, mock_order_shopify, mock_tenant
+        self, ecommerce_service, make_order, mock_db, mock_tenant
     ):
         """Test: Shopify validation without access_token raises error."""
         # Configure tenant with missing token
-        mock_tenant.get_settings.return_value = TenantSettings(
-            ecommerce=EcommerceSettings(
-                sync_on_validation=True,
-                shopify=ShopifyCredentials(
-                    store_url="https://test.myshopify.com",
-                    access_token=None,  # Missing
-                ),
-            )
-        )
-        mock_order_shopify.tenant = mock_tenant
+        mock_tenant.get_settings.return_value = SHOPIFY_SETTINGS_NO_TOKEN
+        order = make_order(tenant=mock_tenant, **_PENDING)
 
-        with pytest.raises(ValueError) as exc_info:
+        with pytest.raises(ValueError, match="access token"):
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_shopify,
+                order=order,
             )
 
-        assert "access token" in str(exc_info.value).lower()
-
-    @pytest.mark.asyncio
     async def test_woocommerce_without_credentials_raises_error(
-        self, ecommerce_service, mock_db, mock_order_woocommerce, mock_tenant_woocommerce
+        self, ecommerce_service, make_order, mock_db, mock_tenant_woocommerce
     ):
         """Test: WooCommerce validation without credentials raises error."""
         # Configure tenant with missing credentials
-        mock_tenant_woocommerce.get_settings.return_value = TenantSettings(
-            ecommerce=EcommerceSettings(
-                sync_on_validation=True,
-                woocommerce=WooCommerceCredentials(
-                    store_url="https://test-woo.com",
-                    consumer_key=None,  # Missing
-                    consumer_secret=None,  # Missing
-                ),
-            )
-        )
-        mock_order_woocommerce.tenant = mock_tenant_woocommerce
+        mock_tenant_woocommerce.get_settings.return_value = WOOCOMMERCE_SETTINGS_NO_CREDENTIALS
+        order = make_order(tenant=mock_tenant_woocommerce, **_PENDING, **_WOOCOMMERCE)
 
-        with pytest.raises(ValueError) as exc_info:
+        with pytest.raises(ValueError, match="credentials"):
             await ecommerce_service.validate_order(
                 db=mock_db,
-                order=mock_order_woocommerce,
+                order=order,
             )
 
-        assert "credentials" in str(exc_info.value).lower()
-
     # ========================================
     # Tenant Without E-commerce
     # ========================================
 
-    @pytest.mark.asyncio
     async def test_tenant_without_ecommerce_validates_locally(
-        self, ecommerce_service, mock_db
+        self, ecommerce_service, make_order, mock_db
     ):
         """Test: Tenant without e-commerce config validates order locally."""
         tenant = MagicMock()
         tenant.id = 1
-        tenant.get_settings.return_value = TenantSettings(
-            ecommerce=None  # No e-commerce configured
-        )
+        tenant.get_settings.return_value = NO_ECOMMERCE_SETTINGS
 
-        order = MagicMock()
-        order.id = 1
-        order.tenant = tenant
-        order.validado = False
+        order = make_order(tenant=tenant, **_PENDING, **_NATIVE)
 
         with patch("app.services.ecommerce.order_repository") as mock_repo:
             mock_repo.update.return_value = order
@@ -333,36 +289,16 @@ class TestEcommerceServicePlatformCoherence:
 class TestEcommerceServiceCancelOrder:
     """Tests for cancel_order platform coherence."""
 
-    @pytest.fixture
-    def ecommerce_service(self) -> EcommerceService:
-        return EcommerceService()
-
-    @pytest.mark.asyncio
-    async def test_cancel_native_order_skips_platform_sync(self, ecommerce_service):
+    async def test_cancel_native_order_skips_platform_sync(
+        self, ecommerce_service, make_order
+    ):
         """Test: Cancelling a native VentIA order does NOT sync to Shopify."""
         from app.schemas.order import OrderCancel
 
         mock_db = MagicMock()
-        order = MagicMock()
-        order.id = 1
-        order.source_platform = None  # Native VentIA order
-        order.validado = False
-        order.notes = ""
-
         tenant = MagicMock()
-        settings = TenantSettings(
-            platform="shopify",
-            ecommerce=EcommerceSettings(
-                shopify=ShopifyCredentials(
-                    store_url="https://test.myshopify.com",
-                    access_token="shpat_test",
-                    api_version="2024-01",
-                ),
-                sync_on_validation=True,
-            ),
-        )
-        tenant.get_settings.return_value = settings
-        order.tenant = tenant
+        tenant.get_settings.return_value = SHOPIFY_SETTINGS
+        order = make_order(tenant=tenant, notes="", **_PENDING, **_NATIVE)  # Native VentIA order
 
         cancel_data = OrderCancel(reason="STAFF", staff_note="Test cancel")
 
@@ -379,33 +315,16 @@ class TestEcommerceServiceCancelOrder:
             update_data = update_args.kwargs.get("obj_in", update_args[1].get("obj_in"))
             assert update_data["status"] == "Cancelado"
 
-    @pytest.mark.asyncio
-    async def test_cancel_shopify_order_with_shopify_tenant_syncs(self, ecommerce_service):
+    async def test_cancel_shopify_order_with_shopify_tenant_syncs(
+        self, ecommerce_service, make_order
+    ):
         """Test: Cancelling a Shopify order with Shopify tenant attempts platform sync."""
         from app.schemas.order import OrderCancel
 
         mock_db = MagicMock()
-        order = MagicMock()
-        order.id = 1
-        order.source_platform = "shopify"  # Shopify-origin order
-        order.validado = False
-        order.shopify_draft_order_id = "gid://shopify/DraftOrder/123"
-        order.notes = ""
-
         tenant = MagicMock()
-        settings = TenantSettings(
-            platform="shopify",
-            ecommerce=EcommerceSettings(
-                shopify=ShopifyCredentials(
-                    store_url="https://test.myshopify.com",
-                    access_token="shpat_test",
-                    api_version="2024-01",
-                ),
-                sync_on_validation=True,
-            ),
-        )
-        tenant.get_settings.return_value = settings
-        order.tenant = tenant
+        tenant.get_settings.return_value = SHOPIFY_SETTINGS
+        order = make_order(tenant=tenant, notes="", **_PENDING)
 
         cancel_data = OrderCancel(reason="STAFF")
 
@@ -414,3 +333,45 @@ class TestEcommerceServiceCancelOrder:
             await ecommerce_service.cancel_order(
                 db=mock_db, order=order, cancel_data=cancel_data
             )
+
+
+class TestEcommerceServiceWooCommerceClientPool:
+    """Tests for reuse of pooled WooCommerce clients across service calls."""
+
+    async def test_calls_for_same_store_share_one_http_client(
+        self, ecommerce_service, make_order, monkeypatch
+    ):
+        """Test: Two WooCommerce calls for one store reuse the same pooled httpx client."""
+        http_clients = []
+
+        async def fake_request(client, method, endpoint, data=None):
+            http_clients.append(client._client)
+            return {"status": "processing"}
+
+        monkeypatch.setattr(WooCommerceClient, "_request", fake_request)
+        order = make_order(tenant=MagicMock(), **_PENDING, **_WOOCOMMERCE)
+
+        await ecommerce_service._sync_woocommerce(order, WOOCOMMERCE_CREDENTIALS)
+        await ecommerce_service._cancel_woocommerce(order, WOOCOMMERCE_CREDENTIALS)
+
+        assert len(http_clients) == 2
+        assert http_clients[0] is http_clients[1]
+        assert not http_clients[0].is_closed
+
+        await ecommerce_service.aclose()
+
+        assert http_clients[0].is_closed
+
+    async def test_rotated_credentials_replace_and_close_old_client(self, ecommerce_service):
+        """Test: A changed consumer secret for the same store closes the old client."""
+        rotated = WOOCOMMERCE_CREDENTIALS.model_copy(update={"consumer_secret": "cs_rotated"})
+
+        first = await ecommerce_service.get_woocommerce_client(WOOCOMMERCE_CREDENTIALS)
+
+        assert await ecommerce_service.get_woocommerce_client(WOOCOMMERCE_CREDENTIALS) is first
+
+        second = await ecommerce_service.get_woocommerce_client(rotated)
+
+        assert second is not first
+        assert first._client.is_closed
+        assert not second._client.is_closed
@@ -4,426 +4,251 @@ US-001: Tests de Validaciones SUNAT para Facturacion
 Tests for InvoiceService validations according to SUNAT rules for document types.
 """
 
+from types import SimpleNamespace
+
 import pytest
-from datetime import datetime
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import MagicMock, Mock
+
+import app.services.invoice as invoice_module
 
+from app.integrations.efact_client import EFactClient
 from app.services.invoice import InvoiceService
 from app.schemas.invoice import InvoiceCreate
-from app.core.permissions import Role
+
+
+# Invoice requests shared by the tests below. create_invoice only reads them.
+INVOICE_BOLETA = InvoiceCreate(invoice_type="03", serie="B001")
+INVOICE_FACTURA = InvoiceCreate(invoice_type="01", serie="F001")
+INVOICE_NC = InvoiceCreate(invoice_type="07", serie="BC01")
+INVOICE_ND = InvoiceCreate(invoice_type="08", serie="BD01")
+INVOICE_BOLETA_BV01 = InvoiceCreate(invoice_type="03", serie="BV01")
+
+
+def _assert_validation_passes(fn, *, forbidden: list[str]) -> None:
+    """Run fn; a ValueError is tolerated unless it mentions a forbidden substring."""
+    try:
+        fn()
+    except ValueError as e:
+        msg = str(e)
+        for substring in forbidden:
+            assert substring not in msg, f"Unexpected validation error for {substring}: {msg}"
+
+
+@pytest.fixture(scope="module")
+def invoice_service() -> InvoiceService:
+    """Create one InvoiceService with a mocked eFact client for the whole module."""
+    service = InvoiceService()
+    service.efact_client = Mock(spec=EFactClient)
+    return service
+
+
+@pytest.fixture(autouse=True)
+def _reset_efact(invoice_service):
+    """Drop eFact return values and calls left over from the previous test."""
+    invoice_service.efact_client.reset_mock(return_value=True, side_effect=True)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def repos(monkeypatch) -> SimpleNamespace:
+    """Replace the repositories and UBL generator used by InvoiceService with mocks."""
+    mocks = SimpleNamespace(
+        order=MagicMock(),
+        tenant=MagicMock(),
+        serie=MagicMock(),
+        gen_ubl=MagicMock(),
+    )
+    monkeypatch.setattr(invoice_module, "order_repository", mocks.order)
+    monkeypatch.setattr(invoice_module, "tenant_repository", mocks.tenant)
+    monkeypatch.setattr(invoice_module, "invoice_serie_repository", mocks.serie)
+    monkeypatch.setattr(invoice_module, "generate_json_ubl", mocks.gen_ubl)
+    return mocks
+
+
+@pytest.fixture
+def happy_path(repos, invoice_service) -> None:
+    """Let create_invoice get past numbering, JSON-UBL generation and eFact submission."""
+    repos.serie.get_next_correlative.return_value = 1
+    repos.gen_ubl.return_value = {"Invoice": [{}]}
+    invoice_service.efact_client.send_document.return_value = {"description": "TICKET-123"}
 
 
 class TestInvoiceServiceSUNATValidations:
     """Tests for SUNAT document type validations in InvoiceService.create_invoice()."""
 
-    @pytest.fixture
-    def invoice_service(self) -> InvoiceService:
-        """Create InvoiceService instance with mocked eFact client."""
-        service = InvoiceService()
-        service.efact_client = MagicMock()
-        return service
-
-    @pytest.fixture
-    def mock_order_with_ruc(self, mock_order):
-        """Order with RUC document."""
-        mock_order.customer_document_type = "6"
-        mock_order.customer_document_number = "20123456789"
-        mock_order.customer_name = "Empresa SAC"
-        return mock_order
+    # Customer document per variant: (customer_document_type, customer_document_number, name)
+    _ORDER_VARIANTS = {
+        "ruc": ("6", "20123456789", "Empresa SAC"),
+        "dni": ("1", "12345678", "Juan Perez"),
+    }
 
     @pytest.fixture
-    def mock_order_with_dni(self, mock_order):
-        """Order with DNI document."""
-        mock_order.customer_document_type = "1"
-        mock_order.customer_document_number = "12345678"
-        mock_order.customer_name = "Juan Perez"
-        return mock_order
+    def mock_order_variant(self, request, make_order):
+        """Order with the customer document named by the indirect parameter ("ruc" or "dni")."""
+        doc_type, doc_number, name = self._ORDER_VARIANTS[request.param]
+        return make_order(
+            customer_document_type=doc_type,
+            customer_document_number=doc_number,
+            customer_name=name,
+        )
 
     # ========================================
     # Factura (01) requires RUC with 11 digits
     # ========================================
 
+    @pytest.mark.parametrize("mock_order_variant", ["dni"], indirect=True)
     def test_factura_requires_ruc_document_type(
-        self, invoice_service, mock_db, mock_order_with_dni, mock_tenant
+        self, repos, invoice_service, mock_db, mock_order_variant, mock_tenant
     ):
         """Test: Factura (tipo 01) requires RUC (tipo_documento=6), not DNI."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_order_repo.get.return_value = mock_order_with_dni
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="01",  # Factura
-                serie="F001",
+        repos.order.get.return_value = mock_order_variant
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(
+            ValueError, match=r"(?=.*Facturas)(?=.*RUC)(?=.*cliente_tipo_documento=6)"
+        ):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_FACTURA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "Facturas" in str(exc_info.value)
-            assert "RUC" in str(exc_info.value)
-            assert "cliente_tipo_documento=6" in str(exc_info.value)
-
     def test_factura_with_dni_instead_of_ruc_fails(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Factura with DNI instead of RUC must fail with clear error."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            # Set DNI instead of RUC
-            mock_order.customer_document_type = "1"
-            mock_order.customer_document_number = "12345678"
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="01",  # Factura
-                serie="F001",
+        # Set DNI instead of RUC
+        repos.order.get.return_value = make_order(
+            customer_document_type="1", customer_document_number="12345678"
+        )
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(ValueError, match=r"(?=.*Facturas)(?=.*RUC)"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_FACTURA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            error_msg = str(exc_info.value)
-            assert "Facturas" in error_msg
-            assert "RUC" in error_msg
-
     def test_factura_ruc_must_be_11_digits(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Factura requires RUC with exactly 11 digits."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            # Set RUC with wrong length (10 digits)
-            mock_order.customer_document_type = "6"
-            mock_order.customer_document_number = "2012345678"  # 10 digits
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="01",
-                serie="F001",
+        # Set RUC with wrong length (10 digits)
+        repos.order.get.return_value = make_order(
+            customer_document_type="6", customer_document_number="2012345678"
+        )
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(ValueError, match=r"(?=.*11 digits)(?=.*10 digits)"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_FACTURA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "11 digits" in str(exc_info.value)
-            assert "10 digits" in str(exc_info.value)
-
+    @pytest.mark.usefixtures("happy_path")
+    @pytest.mark.parametrize("mock_order_variant", ["ruc"], indirect=True)
     def test_factura_with_valid_ruc_11_digits_passes_validation(
-        self, invoice_service, mock_db, mock_order_with_ruc, mock_tenant, mock_invoice_serie
+        self, repos, invoice_service, mock_db, mock_order_variant, mock_tenant
     ):
         """Test: Factura with valid RUC (11 digits) passes document validation."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order_repo.get.return_value = mock_order_with_ruc
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(
-                invoice_type="01",
-                serie="F001",
-            )
-
-            # Should not raise - document type validation passes
-            # (may fail later due to DB operations, but validation passes)
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-            except ValueError as e:
-                # Should not be a document type validation error
-                assert "RUC" not in str(e) or "11 digits" not in str(e)
+        repos.order.get.return_value = mock_order_variant
+        repos.tenant.get.return_value = mock_tenant
+
+        # Document type validation passes (may fail later due to DB operations)
+        _assert_validation_passes(
+            lambda: invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_FACTURA,
+            ),
+            forbidden=["11 digits"],
+        )
 
     # ========================================
     # Boleta (03) accepts multiple document types
     # ========================================
 
-    def test_boleta_accepts_dni_8_digits(
-        self, invoice_service, mock_db, mock_order_with_dni, mock_tenant, mock_invoice_serie
+    @pytest.mark.usefixtures("happy_path")
+    @pytest.mark.parametrize(
+        "doc_type,doc_number,forbidden",
+        [
+            ("1", "12345678", "DNI"),
+            ("6", "20123456789", "RUC"),
+            ("4", "CE12345678", "Carnet"),  # Carnet de Extranjeria, 10 chars
+            ("7", "AB1234567", "Pasaporte"),  # 9 chars
+        ],
+        ids=["dni", "ruc", "carnet_extranjeria", "pasaporte"],
+    )
+    def test_boleta_accepts_document_type(
+        self, repos, invoice_service, mock_db, make_order, mock_tenant,
+        doc_type, doc_number, forbidden,
     ):
-        """Test: Boleta (tipo 03) accepts DNI with 8 digits."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order_repo.get.return_value = mock_order_with_dni
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",  # Boleta
-                serie="B001",
-            )
-
-            # Should not raise for DNI validation
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-            except ValueError as e:
-                # Should not be a DNI validation error
-                assert "DNI" not in str(e)
-
-    def test_boleta_accepts_ruc(
-        self, invoice_service, mock_db, mock_order_with_ruc, mock_tenant
-    ):
-        """Test: Boleta accepts RUC (tipo_documento=6)."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order_repo.get.return_value = mock_order_with_ruc
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
-            )
-
-            # Should not raise for RUC validation on Boleta
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-            except ValueError as e:
-                assert "RUC" not in str(e) or "invalid" not in str(e).lower()
-
-    def test_boleta_accepts_carnet_extranjeria(
-        self, invoice_service, mock_db, mock_order, mock_tenant
-    ):
-        """Test: Boleta accepts Carnet de Extranjeria (tipo_documento=4)."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order.customer_document_type = "4"
-            mock_order.customer_document_number = "CE12345678"  # 10 chars
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
-            )
-
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-            except ValueError as e:
-                assert "Carnet" not in str(e)
-
-    def test_boleta_accepts_pasaporte(
-        self, invoice_service, mock_db, mock_order, mock_tenant
-    ):
-        """Test: Boleta accepts Pasaporte (tipo_documento=7)."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order.customer_document_type = "7"
-            mock_order.customer_document_number = "AB1234567"  # 9 chars
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
-            )
-
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-            except ValueError as e:
-                assert "Pasaporte" not in str(e)
+        """Test: Boleta (tipo 03) accepts DNI, RUC, Carnet de Extranjeria and Pasaporte."""
+        repos.order.get.return_value = make_order(
+            customer_document_type=doc_type, customer_document_number=doc_number
+        )
+        repos.tenant.get.return_value = mock_tenant
+
+        # Should not raise a document type validation error
+        _assert_validation_passes(
+            lambda: invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,
+            ),
+            forbidden=[forbidden],
+        )
 
     def test_boleta_rejects_dni_wrong_length(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Boleta rejects DNI with wrong length (not 8 digits)."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_order.customer_document_type = "1"  # DNI
-            mock_order.customer_document_number = "1234567"  # 7 digits (wrong)
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
+        repos.order.get.return_value = make_order(
+            customer_document_type="1",  # DNI
+            customer_document_number="1234567",  # 7 digits (wrong)
+        )
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(ValueError, match=r"(?=.*DNI)(?=.*8 digits)"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "DNI" in str(exc_info.value)
-            assert "8 digits" in str(exc_info.value)
-
     # ========================================
     # NC/ND (07/08) require reference
     # ========================================
 
-    def test_nota_credito_requires_reference_invoice(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+    @pytest.mark.parametrize(
+        "invoice_data",
+        [INVOICE_NC, INVOICE_ND],  # reference_invoice_id NOT provided
+        ids=["nota_credito", "nota_debito"],
+    )
+    def test_nc_nd_requires_reference_invoice(
+        self, repos, invoice_service, mock_db, make_order, mock_tenant, invoice_data
     ):
-        """Test: Nota de Credito (tipo 07) requires reference_invoice_id."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo:
-
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-
-            invoice_data = InvoiceCreate(
-                invoice_type="07",  # Nota de Credito
-                serie="BC01",
-                # reference_invoice_id NOT provided
+        """Test: NC/ND (tipo 07/08) without reference_invoice_id fails with clear error."""
+        repos.order.get.return_value = make_order()
+        repos.tenant.get.return_value = mock_tenant
+        repos.serie.get_next_correlative.return_value = 1
+
+        with pytest.raises(ValueError, match="Reference invoice ID required"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=invoice_data,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "Reference invoice ID required" in str(exc_info.value)
-
-    def test_nota_debito_requires_reference_invoice(
-        self, invoice_service, mock_db, mock_order, mock_tenant
-    ):
-        """Test: Nota de Debito (tipo 08) requires reference_invoice_id."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo:
-
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-
-            invoice_data = InvoiceCreate(
-                invoice_type="08",  # Nota de Debito
-                serie="BD01",
-                # reference_invoice_id NOT provided
-            )
-
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "Reference invoice ID required" in str(exc_info.value)
-
-    def test_nc_nd_without_reference_fails_with_clear_error(
-        self, invoice_service, mock_db, mock_order, mock_tenant
-    ):
-        """Test: NC/ND without reference must fail with ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo:
-
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-
-            for invoice_type in ["07", "08"]:
-                invoice_data = InvoiceCreate(
-                    invoice_type=invoice_type,
-                    serie="BC01" if invoice_type == "07" else "BD01",
-                )
-
-                with pytest.raises(ValueError) as exc_info:
-                    invoice_service.create_invoice(
-                        db=mock_db,
-                        order_id=1,
-                        tenant_id=1,
-                        invoice_data=invoice_data,
-                    )
-
-                assert "Reference" in str(exc_info.value)
-
     # ========================================
     # IGV Calculation Tests
     # ========================================
@@ -445,294 +270,327 @@ class TestInvoiceServiceSUNATValidations:
         """Test: IGV + subtotal = total with 2 decimal precision."""
         test_totals = [118.00, 236.00, 590.00, 1180.00, 59.00, 23.60]
 
-        for total in test_totals:
-            subtotal = round(total / 1.18, 2)
-            igv = round(total - subtotal, 2)
+        splits = [(total, round(total / 1.18, 2)) for total in test_totals]
+        splits = [(total, subtotal, round(total - subtotal, 2)) for total, subtotal in splits]
+
+        # Allow 1 cent tolerance for rounding; report every failing total at once
+        mismatches = [s for s in splits if abs((s[1] + s[2]) - s[0]) > 0.01]
+        assert not mismatches, f"(total, subtotal, igv) out of tolerance: {mismatches}"
+
+
+class TestInvoiceServiceCustomerDocumentRules:
+    """Tests pinning the SUNAT customer document rules to their pre-table behavior."""
+
+    # (invoice_type, customer_document_type, customer_document_number)
+    _ACCEPTED = [
+        ("01", "6", "20123456789"),
+        ("03", "1", "12345678"),
+        ("03", "6", "20123456789"),
+        ("03", "4", "12345678"),
+        ("03", "4", "123456789012"),
+        ("03", "7", "AB123"),
+        ("03", "7", "AB1234567890"),
+        ("03", "0", "00000000"),
+        ("03", "0", "0"),
+        ("03", "A", "1"),
+        ("03", "A", "1234567890123456"),
+        ("07", "0", ""),
+        ("07", "1", "12345678"),
+        ("07", "4", "123"),
+        ("07", "6", "20123456789"),
+        ("07", "7", "1"),
+        ("07", "A", "1"),
+        ("08", "1", "12345678"),
+        ("08", "6", "20123456789"),
+        ("99", "X", ""),  # Unknown invoice types are left to other checks
+    ]
+
+    # (invoice_type, customer_document_type, customer_document_number, exact error message)
+    _REJECTED = [
+        (
+            "01",
+            "1",
+            "12345678",
+            "Facturas (invoice_type=01) require RUC (cliente_tipo_documento=6) with 11 digits. "
+            "Received cliente_tipo_documento=1. "
+            "For customers without RUC, use Boleta (invoice_type=03) instead.",
+        ),
+        (
+            "01",
+            "6",
+            "2012345678",
+            "Facturas require RUC with 11 digits. Received: 2012345678 (10 digits).",
+        ),
+        (
+            "01",
+            "6",
+            "201234567890",
+            "Facturas require RUC with 11 digits. Received: 201234567890 (12 digits).",
+        ),
+        (
+            "03",
+            "5",
+            "12345678",
+            "Invalid cliente_tipo_documento for Boleta: 5. "
+            "Valid types: 0 (Sin documento), 1 (DNI), 4 (Carnet extranjería), "
+            "6 (RUC), 7 (Pasaporte), A (Cédula diplomática).",
+        ),
+        (
+            "03",
+            "1",
+            "1234567",
+            "DNI (tipo_documento=1) must be 8 digits. Received: 1234567 (7 digits).",
+        ),
+        (
+            "03",
+            "1",
+            "123456789",
+            "DNI (tipo_documento=1) must be 8 digits. Received: 123456789 (9 digits).",
+        ),
+        (
+            "03",
+            "6",
+            "2012345678",
+            "RUC (tipo_documento=6) must be 11 digits. Received: 2012345678 (10 digits).",
+        ),
+        (
+            "03",
+            "4",
+            "1234567",
+            "Carnet de extranjería (tipo_documento=4) must be between 8 and 12 characters. "
+            "Received: 1234567 (7 characters).",
+        ),
+        (
+            "03",
+            "4",
+            "1234567890123",
+            "Carnet de extranjería (tipo_documento=4) must be between 8 and 12 characters. "
+            "Received: 1234567890123 (13 characters).",
+        ),
+        (
+            "03",
+            "7",
+            "AB12",
+            "Pasaporte (tipo_documento=7) must be between 5 and 12 characters. "
+            "Received: AB12 (4 characters).",
+        ),
+        (
+            "03",
+            "7",
+            "AB12345678901",
+            "Pasaporte (tipo_documento=7) must be between 5 and 12 characters. "
+            "Received: AB12345678901 (13 characters).",
+        ),
+        (
+            "03",
+            "0",
+            "",
+            "Document number is required even for tipo_documento=0 (Sin documento). "
+            "Use a placeholder value like '00000000'.",
+        ),
+        (
+            "07",
+            "5",
+            "12345678",
+            "Invalid cliente_tipo_documento: 5. Valid types: 0, 1, 4, 6, 7, A.",
+        ),
+        ("07", "1", "1234567", "DNI must be 8 digits. Received: 7 digits."),
+        ("07", "6", "2012345678", "RUC must be 11 digits. Received: 10 digits."),
+        (
+            "08",
+            "X",
+            "12345678",
+            "Invalid cliente_tipo_documento: X. Valid types: 0, 1, 4, 6, 7, A.",
+        ),
+        ("08", "1", "123456789", "DNI must be 8 digits. Received: 9 digits."),
+        ("08", "6", "201234567890", "RUC must be 11 digits. Received: 12 digits."),
+    ]
+
+    @pytest.mark.parametrize("invoice_type,document_type,document_number", _ACCEPTED)
+    def test_document_accepted(
+        self, invoice_service, invoice_type, document_type, document_number
+    ):
+        """Test: Valid customer documents pass the SUNAT checks for the invoice type."""
+        invoice_service._validate_customer_document(invoice_type, document_type, document_number)
 
-            # Allow 1 cent tolerance for rounding
-            assert abs((subtotal + igv) - total) <= 0.01, \
-                f"Failed for total={total}: subtotal={subtotal}, igv={igv}"
+    @pytest.mark.parametrize("invoice_type,document_type,document_number,message", _REJECTED)
+    def test_document_rejected(
+        self, invoice_service, invoice_type, document_type, document_number, message
+    ):
+        """Test: Invalid customer documents raise the exact SUNAT error message."""
+        with pytest.raises(ValueError) as exc_info:
+            invoice_service._validate_customer_document(
+                invoice_type, document_type, document_number
+            )
+
+        assert str(exc_info.value) == message
 
 
 class TestInvoiceServiceOrderValidations:
     """Tests for order-related validations in InvoiceService."""
 
-    @pytest.fixture
-    def invoice_service(self) -> InvoiceService:
-        """Create InvoiceService instance."""
-        service = InvoiceService()
-        service.efact_client = MagicMock()
-        return service
-
-    def test_order_not_found_raises_error(self, invoice_service, mock_db):
+    def test_order_not_found_raises_error(self, repos, invoice_service, mock_db):
         """Test: Non-existent order raises ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo:
-            mock_order_repo.get.return_value = None
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
+        repos.order.get.return_value = None
+
+        with pytest.raises(ValueError, match="Order 999 not found"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=999,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=999,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "Order 999 not found" in str(exc_info.value)
-
     def test_order_not_validated_raises_error(
-        self, invoice_service, mock_db, mock_order_pending, mock_tenant
+        self, repos, invoice_service, mock_db, mock_order_pending, mock_tenant
     ):
         """Test: Order not validated (validado=False) raises ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_order_repo.get.return_value = mock_order_pending
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
+        repos.order.get.return_value = mock_order_pending
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(ValueError, match="not been validated"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=2,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=2,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "not been validated" in str(exc_info.value)
-
     def test_order_belongs_to_different_tenant_raises_error(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Order belonging to different tenant raises ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_order.tenant_id = 1
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
+        repos.order.get.return_value = make_order(tenant_id=1)
+        repos.tenant.get.return_value = mock_tenant
+
+        # Try to create invoice with different tenant_id
+        with pytest.raises(ValueError, match="does not belong to tenant"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=999,  # Different tenant
+                invoice_data=INVOICE_BOLETA,
             )
 
-            # Try to create invoice with different tenant_id
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=999,  # Different tenant
-                    invoice_data=invoice_data,
-                )
-
-            assert "does not belong to tenant" in str(exc_info.value)
-
     def test_order_without_customer_document_raises_error(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Order without customer document info raises ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_order.customer_document_type = None
-            mock_order.customer_document_number = None
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
-                # No customer document provided in request either
+        repos.order.get.return_value = make_order(
+            customer_document_type=None, customer_document_number=None
+        )
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(ValueError, match="Customer document information is required"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,  # No customer document provided in request either
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "Customer document information is required" in str(exc_info.value)
-
 
 class TestInvoiceServiceTenantValidations:
     """Tests for tenant-related validations in InvoiceService."""
 
-    @pytest.fixture
-    def invoice_service(self) -> InvoiceService:
-        """Create InvoiceService instance."""
-        service = InvoiceService()
-        service.efact_client = MagicMock()
-        return service
-
     def test_tenant_without_ruc_raises_error(
-        self, invoice_service, mock_db, mock_order, mock_tenant
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Tenant without efact_ruc raises ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_tenant.efact_ruc = None  # No RUC configured
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = mock_tenant
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
+        mock_tenant.efact_ruc = None  # No RUC configured
+        repos.order.get.return_value = make_order()
+        repos.tenant.get.return_value = mock_tenant
+
+        with pytest.raises(ValueError, match="RUC configured"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "RUC configured" in str(exc_info.value)
-
     def test_tenant_not_found_raises_error(
-        self, invoice_service, mock_db, mock_order
+        self, repos, invoice_service, mock_db, make_order
     ):
         """Test: Non-existent tenant raises ValueError."""
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo:
-
-            mock_order_repo.get.return_value = mock_order
-            mock_tenant_repo.get.return_value = None  # Tenant not found
-
-            invoice_data = InvoiceCreate(
-                invoice_type="03",
-                serie="B001",
+        repos.order.get.return_value = make_order()
+        repos.tenant.get.return_value = None  # Tenant not found
+
+        with pytest.raises(ValueError, match=r"(?=.*Tenant)(?=.*not found)"):
+            invoice_service.create_invoice(
+                db=mock_db,
+                order_id=1,
+                tenant_id=1,
+                invoice_data=INVOICE_BOLETA,
             )
 
-            with pytest.raises(ValueError) as exc_info:
-                invoice_service.create_invoice(
-                    db=mock_db,
-                    order_id=1,
-                    tenant_id=1,
-                    invoice_data=invoice_data,
-                )
-
-            assert "Tenant" in str(exc_info.value)
-            assert "not found" in str(exc_info.value)
-
 
 class TestInvoiceServiceZeroPriceItems:
     """Tests for filtering zero-price items from eFact submission."""
 
-    @pytest.fixture
-    def invoice_service(self) -> InvoiceService:
-        service = InvoiceService()
-        service.efact_client = MagicMock()
-        return service
-
+    @pytest.mark.usefixtures("happy_path")
     def test_zero_price_delivery_excluded_from_efact(
-        self, invoice_service, mock_db, mock_tenant, mock_invoice_serie
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Items with unitPrice=0 (like free DELIVERY) are excluded from JSON-UBL."""
-        order = MagicMock()
-        order.id = 1
-        order.tenant_id = 1
-        order.tenant = mock_tenant
-        order.customer_email = "test@example.com"
-        order.customer_name = "Test User"
-        order.customer_document_type = "1"
-        order.customer_document_number = "40253345"
-        order.total_price = 70.0
-        order.currency = "PEN"
-        order.validado = True
-        order.line_items = [
-            {"sku": "PROD1", "product": "Absorpet Toalla", "unitPrice": 35, "quantity": 2, "subtotal": 70},
-            {"sku": None, "product": "DELIVERY", "unitPrice": 0, "quantity": 1, "subtotal": 0},
-        ]
-
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order_repo.get.return_value = order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(invoice_type="03", serie="BV01")
-
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db, order_id=1, tenant_id=1, invoice_data=invoice_data
-                )
-            except Exception:
-                pass
-
-            # Verify generate_json_ubl was called with filtered items
-            if mock_gen_ubl.called:
-                call_kwargs = mock_gen_ubl.call_args.kwargs
-                items = call_kwargs.get("items", [])
-                # Only the product with price > 0 should be included
-                assert len(items) == 1
-                assert items[0]["description"] == "Absorpet Toalla"
-
+        order = make_order(
+            customer_email="test@example.com",
+            customer_name="Test User",
+            customer_document_number="40253345",
+            total_price=70.0,
+            line_items=[
+                {"sku": "PROD1", "product": "Absorpet Toalla", "unitPrice": 35,
+                 "quantity": 2, "subtotal": 70},
+                {"sku": None, "product": "DELIVERY", "unitPrice": 0, "quantity": 1, "subtotal": 0},
+            ],
+        )
+
+        repos.order.get.return_value = order
+        repos.tenant.get.return_value = mock_tenant
+
+        try:
+            invoice_service.create_invoice(
+                db=mock_db, order_id=1, tenant_id=1, invoice_data=INVOICE_BOLETA_BV01
+            )
+        except Exception:
+            pass
+
+        # Verify generate_json_ubl was called with filtered items
+        if repos.gen_ubl.called:
+            call_kwargs = repos.gen_ubl.call_args.kwargs
+            items = call_kwargs.get("items", [])
+            # Only the product with price > 0 should be included
+            assert len(items) == 1
+            assert items[0]["description"] == "Absorpet Toalla"
+
+    @pytest.mark.usefixtures("happy_path")
     def test_all_items_with_price_included(
-        self, invoice_service, mock_db, mock_tenant, mock_invoice_serie
+        self, repos, invoice_service, mock_db, make_order, mock_tenant
     ):
         """Test: Items with unitPrice > 0 are all included in JSON-UBL."""
-        order = MagicMock()
-        order.id = 1
-        order.tenant_id = 1
-        order.tenant = mock_tenant
-        order.customer_email = "test@example.com"
-        order.customer_name = "Test User"
-        order.customer_document_type = "1"
-        order.customer_document_number = "12345678"
-        order.total_price = 118.0
-        order.currency = "PEN"
-        order.validado = True
-        order.line_items = [
-            {"sku": "PROD1", "product": "Producto A", "unitPrice": 59, "quantity": 1, "subtotal": 59},
-            {"sku": "PROD2", "product": "Producto B", "unitPrice": 59, "quantity": 1, "subtotal": 59},
-        ]
-
-        with patch("app.services.invoice.order_repository") as mock_order_repo, \
-             patch("app.services.invoice.tenant_repository") as mock_tenant_repo, \
-             patch("app.services.invoice.invoice_serie_repository") as mock_serie_repo, \
-             patch("app.services.invoice.generate_json_ubl") as mock_gen_ubl:
-
-            mock_order_repo.get.return_value = order
-            mock_tenant_repo.get.return_value = mock_tenant
-            mock_serie_repo.get_next_correlative.return_value = 1
-            mock_gen_ubl.return_value = {"Invoice": [{}]}
-
-            invoice_service.efact_client.send_document.return_value = {
-                "description": "TICKET-123"
-            }
-
-            invoice_data = InvoiceCreate(invoice_type="03", serie="BV01")
-
-            try:
-                invoice_service.create_invoice(
-                    db=mock_db, order_id=1, tenant_id=1, invoice_data=invoice_data
-                )
-            except Exception:
-                pass
-
-            # Verify both items are included
-            if mock_gen_ubl.called:
-                call_kwargs = mock_gen_ubl.call_args.kwargs
-                items = call_kwargs.get("items", [])
-                assert len(items) == 2
+        order = make_order(
+            customer_email="test@example.com",
+            customer_name="Test User",
+            line_items=[
+                {"sku": "PROD1", "product": "Producto A", "unitPrice": 59,
+                 "quantity": 1, "subtotal": 59},
+                {"sku": "PROD2", "product": "Producto B", "unitPrice": 59,
+                 "quantity": 1, "subtotal": 59},
+            ],
+        )
+
+        repos.order.get.return_value = order
+        repos.tenant.get.return_value = mock_tenant
+
+        try:
+            invoice_service.create_invoice(
+                db=mock_db, order_id=1, tenant_id=1, invoice_data=INVOICE_BOLETA_BV01
+            )
+        except Exception:
+            pass
+
+        # Verify both items are included
+        if repos.gen_ubl.called:
+            call_kwargs = repos.gen_ubl.call_args.kwargs
+            items = call_kwargs.get("items", [])
+            assert len(items) == 2
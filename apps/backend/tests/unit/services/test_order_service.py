@@ -4,425 +4,316 @@ US-002: Tests de Deteccion de Ordenes Duplicadas
 Tests for OrderService duplicate detection and line item calculations.
 """
 
+import re
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 from app.services.order import OrderService
-from app.schemas.order import OrderCreate, LineItemBase
+from app.schemas.order import OrderCreate, OrderUpdate, LineItemBase
 
 
-class TestOrderServiceDuplicateDetection:
-    """Tests for duplicate order detection in OrderService.create_order()."""
+# Line item validated once at import. create_order only dumps it, never mutates it.
+_LINE_ITEM_PROD = LineItemBase(sku="PROD", product="Product", unitPrice=100.00, quantity=1)
 
-    @pytest.fixture
-    def order_service(self) -> OrderService:
-        """Create OrderService instance."""
-        return OrderService()
-
-    @pytest.fixture
-    def valid_order_create(self) -> OrderCreate:
-        """Create a valid OrderCreate schema."""
-        return OrderCreate(
-            customer_email="cliente@example.com",
-            customer_name="Juan Perez",
-            customer_document_type="1",
-            customer_document_number="12345678",
-            shopify_draft_order_id="gid://shopify/DraftOrder/123456",
-            line_items=[
-                LineItemBase(
-                    sku="PROD001",
-                    product="Producto Test",
-                    unitPrice=100.00,
-                    quantity=1,
-                )
-            ],
-            currency="PEN",
-        )
 
-    @pytest.fixture
-    def valid_woo_order_create(self) -> OrderCreate:
-        """Create a valid OrderCreate schema for WooCommerce."""
-        return OrderCreate(
-            customer_email="cliente@example.com",
-            customer_name="Juan Perez",
-            customer_document_type="1",
-            customer_document_number="12345678",
-            woocommerce_order_id=789,
-            line_items=[
-                LineItemBase(
-                    sku="PROD001",
-                    product="Producto Test",
-                    unitPrice=100.00,
-                    quantity=1,
-                )
-            ],
-            currency="PEN",
-        )
+@pytest.fixture(scope="module")
+def order_service() -> OrderService:
+    """Create OrderService instance (shared by the module)."""
+    return OrderService()
+
+
+@pytest.fixture(autouse=True)
+def mock_order_repo(monkeypatch) -> MagicMock:
+    """Replace the order repository used by OrderService with a mock.
+
+    Duplicate lookups find nothing by default. Tests that need an existing
+    order override the one lookup they exercise.
+    """
+    repo = MagicMock()
+    repo.get_by_shopify_draft_id.return_value = None
+    repo.get_by_woocommerce_order_id.return_value = None
+    monkeypatch.setattr("app.services.order.order_repository", repo)
+    return repo
+
+
+class TestOrderServiceDuplicateDetection:
+    """Tests for duplicate order detection in OrderService.create_order()."""
 
     # ========================================
     # Shopify Duplicate Detection
     # ========================================
 
     def test_duplicate_shopify_order_same_tenant_raises_error(
-        self, order_service, mock_db, valid_order_create
+        self, mock_order_repo, order_service, mock_db, make_order_create
     ):
         """Test: Create order with existing shopify_draft_order_id for same tenant fails."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            # Simulate existing order found
-            mock_repo.get_by_shopify_draft_id.return_value = MagicMock(id=1)
-
-            with pytest.raises(ValueError) as exc_info:
-                order_service.create_order(
-                    db=mock_db,
-                    order_in=valid_order_create,
-                    tenant_id=1,
-                )
-
-            error_msg = str(exc_info.value)
-            assert "already exists" in error_msg
-            assert "Shopify" in error_msg
-            assert valid_order_create.shopify_draft_order_id in error_msg
+        order_in = make_order_create()
 
-    def test_new_shopify_order_same_tenant_succeeds(
-        self, order_service, mock_db, valid_order_create
-    ):
-        """Test: Create order with new shopify_draft_order_id succeeds."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            # No existing order found
-            mock_repo.get_by_shopify_draft_id.return_value = None
-            mock_repo.get_by_woocommerce_order_id.return_value = None
-
-            # Mock create to return an order
-            mock_order = MagicMock()
-            mock_order.id = 1
-            mock_order.total_price = 100.00
-            mock_repo.create.return_value = mock_order
-
-            result = order_service.create_order(
+        # Simulate existing order found
+        mock_order_repo.get_by_shopify_draft_id.return_value = SimpleNamespace(id=1)
+
+        draft_id = re.escape(order_in.shopify_draft_order_id)
+        expected = rf"Shopify draft order ID {draft_id} already exists"
+        with pytest.raises(ValueError, match=expected):
+            order_service.create_order(
                 db=mock_db,
-                order_in=valid_order_create,
+                order_in=order_in,
                 tenant_id=1,
             )
 
-            assert result.id == 1
-            mock_repo.create.assert_called_once()
+    def test_new_shopify_order_same_tenant_succeeds(
+        self, mock_order_repo, order_service, mock_db, make_order_create
+    ):
+        """Test: Create order with new shopify_draft_order_id succeeds."""
+        order_in = make_order_create()
+
+        # Mock create to return an order
+        mock_order = SimpleNamespace(id=1, total_price=100.00)
+        mock_order_repo.create.return_value = mock_order
+
+        result = order_service.create_order(
+            db=mock_db,
+            order_in=order_in,
+            tenant_id=1,
+        )
+
+        assert result.id == 1
+        mock_order_repo.create.assert_called_once()
 
     def test_same_shopify_id_different_tenant_allowed(
-        self, order_service, mock_db, valid_order_create
+        self, mock_order_repo, order_service, mock_db, make_order_create
     ):
         """Test: Same shopify_draft_order_id for different tenants is allowed (multitenancy)."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            # No existing order for tenant 2 (even though tenant 1 has one)
-            mock_repo.get_by_shopify_draft_id.return_value = None
-            mock_repo.get_by_woocommerce_order_id.return_value = None
-
-            mock_order = MagicMock()
-            mock_order.id = 2
-            mock_order.total_price = 100.00
-            mock_repo.create.return_value = mock_order
-
-            # Create for tenant 2
-            result = order_service.create_order(
-                db=mock_db,
-                order_in=valid_order_create,
-                tenant_id=2,  # Different tenant
-            )
+        order_in = make_order_create()
 
-            assert result.id == 2
-            # Verify the check was done with correct tenant_id
-            mock_repo.get_by_shopify_draft_id.assert_called_once_with(
-                mock_db,
-                2,  # tenant_id
-                valid_order_create.shopify_draft_order_id,
-            )
+        mock_order = SimpleNamespace(id=2, total_price=100.00)
+        mock_order_repo.create.return_value = mock_order
+
+        # Create for tenant 2
+        result = order_service.create_order(
+            db=mock_db,
+            order_in=order_in,
+            tenant_id=2,  # Different tenant
+        )
+
+        assert result.id == 2
+        # Verify the check was done with correct tenant_id
+        assert mock_order_repo.get_by_shopify_draft_id.call_count == 1
+        _, tenant_id, draft_id = mock_order_repo.get_by_shopify_draft_id.call_args.args
+        assert tenant_id == 2
+        assert draft_id == order_in.shopify_draft_order_id
 
     # ========================================
     # WooCommerce Duplicate Detection
     # ========================================
 
     def test_duplicate_woocommerce_order_same_tenant_raises_error(
-        self, order_service, mock_db, valid_woo_order_create
+        self, mock_order_repo, order_service, mock_db, make_order_create
     ):
         """Test: Create order with existing woocommerce_order_id for same tenant fails."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get_by_shopify_draft_id.return_value = None
-            mock_repo.get_by_woocommerce_order_id.return_value = MagicMock(id=1)
+        order_in = make_order_create(woocommerce_order_id=789, shopify_draft_order_id=None)
 
-            with pytest.raises(ValueError) as exc_info:
-                order_service.create_order(
-                    db=mock_db,
-                    order_in=valid_woo_order_create,
-                    tenant_id=1,
-                )
+        mock_order_repo.get_by_woocommerce_order_id.return_value = SimpleNamespace(id=1)
 
-            error_msg = str(exc_info.value)
-            assert "already exists" in error_msg
-            assert "WooCommerce" in error_msg
+        with pytest.raises(ValueError, match=r"WooCommerce order ID \d+ already exists"):
+            order_service.create_order(
+                db=mock_db,
+                order_in=order_in,
+                tenant_id=1,
+            )
 
     def test_same_woocommerce_id_different_tenant_allowed(
-        self, order_service, mock_db, valid_woo_order_create
+        self, mock_order_repo, order_service, mock_db, make_order_create
     ):
         """Test: Same woocommerce_order_id for different tenants is allowed."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get_by_shopify_draft_id.return_value = None
-            mock_repo.get_by_woocommerce_order_id.return_value = None
+        order_in = make_order_create(woocommerce_order_id=789, shopify_draft_order_id=None)
 
-            mock_order = MagicMock()
-            mock_order.id = 2
-            mock_order.total_price = 100.00
-            mock_repo.create.return_value = mock_order
+        mock_order = SimpleNamespace(id=2, total_price=100.00)
+        mock_order_repo.create.return_value = mock_order
 
-            result = order_service.create_order(
-                db=mock_db,
-                order_in=valid_woo_order_create,
-                tenant_id=2,
-            )
+        result = order_service.create_order(
+            db=mock_db,
+            order_in=order_in,
+            tenant_id=2,
+        )
 
-            assert result.id == 2
-            mock_repo.get_by_woocommerce_order_id.assert_called_once_with(
-                mock_db,
-                2,
-                valid_woo_order_create.woocommerce_order_id,
-            )
+        assert result.id == 2
+        assert mock_order_repo.get_by_woocommerce_order_id.call_count == 1
+        _, tenant_id, woo_id = mock_order_repo.get_by_woocommerce_order_id.call_args.args
+        assert tenant_id == 2
+        assert woo_id == order_in.woocommerce_order_id
 
 
 class TestOrderServiceLineItemCalculations:
     """Tests for line item calculations in OrderService."""
 
-    @pytest.fixture
-    def order_service(self) -> OrderService:
-        """Create OrderService instance."""
-        return OrderService()
-
-    def test_calculate_total_from_line_items(self, order_service):
-        """Test: Total is calculated correctly from line items."""
-        line_items = [
-            {"unitPrice": 100.00, "quantity": 2},  # 200.00
-            {"unitPrice": 50.00, "quantity": 1},   # 50.00
-        ]
-
-        processed_items, total = order_service._calculate_line_items_and_total(line_items)
-
-        assert total == 250.00
-        assert len(processed_items) == 2
-        assert processed_items[0]["subtotal"] == 200.00
-        assert processed_items[1]["subtotal"] == 50.00
-
-    def test_calculate_subtotal_per_item(self, order_service):
-        """Test: Subtotal is calculated for each line item."""
-        line_items = [
-            {"sku": "A", "unitPrice": 59.00, "quantity": 2},
-            {"sku": "B", "unitPrice": 100.00, "quantity": 3},
-        ]
-
-        processed_items, total = order_service._calculate_line_items_and_total(line_items)
-
-        assert processed_items[0]["subtotal"] == 118.00
-        assert processed_items[1]["subtotal"] == 300.00
-        assert total == 418.00
-
-    def test_empty_line_items_returns_zero(self, order_service):
-        """Test: Empty line items returns total of 0."""
-        processed_items, total = order_service._calculate_line_items_and_total([])
-
-        assert processed_items == []
-        assert total == 0.0
-
-    def test_none_line_items_returns_zero(self, order_service):
-        """Test: None line items returns total of 0."""
-        processed_items, total = order_service._calculate_line_items_and_total(None)
-
-        assert processed_items == []
-        assert total == 0.0
-
-    def test_missing_unit_price_defaults_to_zero(self, order_service):
-        """Test: Line item without unitPrice defaults to 0."""
-        line_items = [
-            {"sku": "A", "quantity": 2},  # No unitPrice
-        ]
-
-        processed_items, total = order_service._calculate_line_items_and_total(line_items)
-
-        assert processed_items[0]["subtotal"] == 0.0
-        assert total == 0.0
-
-    def test_missing_quantity_defaults_to_one(self, order_service):
-        """Test: Line item without quantity defaults to 1."""
-        line_items = [
-            {"sku": "A", "unitPrice": 100.00},  # No quantity
-        ]
-
+    @pytest.mark.parametrize(
+        "line_items,expected_subtotals,expected_total",
+        [
+            (
+                [
+                    {"unitPrice": 100.00, "quantity": 2},  # 200.00
+                    {"unitPrice": 50.00, "quantity": 1},   # 50.00
+                ],
+                [200.00, 50.00],
+                250.00,
+            ),
+            (
+                [
+                    {"sku": "A", "unitPrice": 59.00, "quantity": 2},
+                    {"sku": "B", "unitPrice": 100.00, "quantity": 3},
+                ],
+                [118.00, 300.00],
+                418.00,
+            ),
+            ([], [], 0.0),
+            (None, [], 0.0),
+            ([{"sku": "A", "quantity": 2}], [0.0], 0.0),  # No unitPrice -> 0
+            ([{"sku": "A", "unitPrice": 100.00}], [100.00], 100.00),  # No quantity -> 1
+        ],
+        ids=[
+            "total_from_line_items",
+            "subtotal_per_item",
+            "empty_line_items",
+            "none_line_items",
+            "missing_unit_price",
+            "missing_quantity",
+        ],
+    )
+    def test_calculate_line_items_and_total(
+        self, order_service, line_items, expected_subtotals, expected_total
+    ):
+        """Test: Subtotals and total are calculated from line items, with defaults for gaps."""
         processed_items, total = order_service._calculate_line_items_and_total(line_items)
 
-        assert processed_items[0]["subtotal"] == 100.00
-        assert total == 100.00
+        assert [item["subtotal"] for item in processed_items] == expected_subtotals
+        assert total == expected_total
 
 
 class TestOrderServiceTotalValidation:
     """Tests for total price validation in OrderService."""
 
-    @pytest.fixture
-    def order_service(self) -> OrderService:
-        """Create OrderService instance."""
-        return OrderService()
-
     def test_order_with_empty_line_items_raises_error(self, order_service, mock_db):
         """Test: Order with no line items is rejected."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get_by_shopify_draft_id.return_value = None
-            mock_repo.get_by_woocommerce_order_id.return_value = None
-
-            order_create = OrderCreate(
-                customer_email="test@example.com",
-                customer_name="Test",
-                shopify_draft_order_id="gid://shopify/DraftOrder/999",
-                line_items=[],  # Empty
-                currency="PEN",
-            )
-
-            with pytest.raises(ValueError) as exc_info:
-                order_service.create_order(
-                    db=mock_db,
-                    order_in=order_create,
-                    tenant_id=1,
-                )
-
-            assert "positive price" in str(exc_info.value).lower()
-
-    def test_order_with_positive_total_succeeds(self, order_service, mock_db):
-        """Test: Order with positive total succeeds."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get_by_shopify_draft_id.return_value = None
-            mock_repo.get_by_woocommerce_order_id.return_value = None
-
-            mock_order = MagicMock()
-            mock_order.id = 1
-            mock_order.total_price = 100.00
-            mock_repo.create.return_value = mock_order
-
-            order_create = OrderCreate(
-                customer_email="test@example.com",
-                customer_name="Test",
-                shopify_draft_order_id="gid://shopify/DraftOrder/999",
-                line_items=[
-                    LineItemBase(
-                        sku="PROD",
-                        product="Product",
-                        unitPrice=100.00,
-                        quantity=1,
-                    )
-                ],
-                currency="PEN",
-            )
+        order_create = OrderCreate(
+            customer_email="test@example.com",
+            customer_name="Test",
+            shopify_draft_order_id="gid://shopify/DraftOrder/999",
+            line_items=[],  # Empty
+            currency="PEN",
+        )
 
-            result = order_service.create_order(
+        with pytest.raises(ValueError, match="positive price"):
+            order_service.create_order(
                 db=mock_db,
                 order_in=order_create,
                 tenant_id=1,
             )
 
-            assert result.id == 1
-            mock_repo.create.assert_called_once()
+    def test_order_with_positive_total_succeeds(self, mock_order_repo, order_service, mock_db):
+        """Test: Order with positive total succeeds."""
+        mock_order = SimpleNamespace(id=1, total_price=100.00)
+        mock_order_repo.create.return_value = mock_order
+
+        order_create = OrderCreate(
+            customer_email="test@example.com",
+            customer_name="Test",
+            shopify_draft_order_id="gid://shopify/DraftOrder/999",
+            line_items=[_LINE_ITEM_PROD],
+            currency="PEN",
+        )
+
+        result = order_service.create_order(
+            db=mock_db,
+            order_in=order_create,
+            tenant_id=1,
+        )
+
+        assert result.id == 1
+        mock_order_repo.create.assert_called_once()
 
 
 class TestOrderServiceCRUD:
     """Tests for basic CRUD operations in OrderService."""
 
-    @pytest.fixture
-    def order_service(self) -> OrderService:
-        """Create OrderService instance."""
-        return OrderService()
-
-    def test_get_order_returns_order(self, order_service, mock_db):
+    def test_get_order_returns_order(self, mock_order_repo, order_service, mock_db):
         """Test: get_order returns order when found."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_order = MagicMock()
-            mock_order.id = 1
-            mock_repo.get.return_value = mock_order
+        mock_order = SimpleNamespace(id=1)
+        mock_order_repo.get.return_value = mock_order
 
-            result = order_service.get_order(mock_db, 1)
+        result = order_service.get_order(mock_db, 1)
 
-            assert result.id == 1
-            mock_repo.get.assert_called_once_with(mock_db, 1)
+        assert result.id == 1
+        mock_order_repo.get.assert_called_once_with(mock_db, 1)
 
-    def test_get_order_returns_none_when_not_found(self, order_service, mock_db):
+    def test_get_order_returns_none_when_not_found(self, mock_order_repo, order_service, mock_db):
         """Test: get_order returns None when order not found."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get.return_value = None
+        mock_order_repo.get.return_value = None
 
-            result = order_service.get_order(mock_db, 999)
+        result = order_service.get_order(mock_db, 999)
 
-            assert result is None
+        assert result is None
 
-    def test_update_order_not_found_raises_error(self, order_service, mock_db):
+    def test_update_order_not_found_raises_error(self, mock_order_repo, order_service, mock_db):
         """Test: update_order raises ValueError when order not found."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get.return_value = None
-
-            from app.schemas.order import OrderUpdate
-            update_data = OrderUpdate(status="Enviado")
+        mock_order_repo.get.return_value = None
 
-            with pytest.raises(ValueError) as exc_info:
-                order_service.update_order(mock_db, 999, update_data)
+        update_data = OrderUpdate(status="Enviado")
 
-            assert "not found" in str(exc_info.value)
+        with pytest.raises(ValueError, match="not found"):
+            order_service.update_order(mock_db, 999, update_data)
 
-    def test_update_order_with_line_items_recalculates_total(self, order_service, mock_db):
+    def test_update_order_with_line_items_recalculates_total(
+        self, mock_order_repo, order_service, mock_db
+    ):
         """Test: update_order recalculates subtotals and total_price when line_items provided."""
-        from app.schemas.order import OrderUpdate
+        existing_order = SimpleNamespace(id=1)
 
-        existing_order = MagicMock()
-        existing_order.id = 1
+        mock_order_repo.get.return_value = existing_order
+        mock_order_repo.update.return_value = existing_order
 
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get.return_value = existing_order
-            mock_repo.update.return_value = existing_order
-
-            update_data = OrderUpdate(
-                line_items=[
-                    LineItemBase(product="Polo", sku="SKU1", quantity=2, unitPrice=49.0),
-                    LineItemBase(product="Bolsa", sku="SKU2", quantity=1, unitPrice=10.0),
-                ]
-            )
+        update_data = OrderUpdate(
+            line_items=[
+                LineItemBase(product="Polo", sku="SKU1", quantity=2, unitPrice=49.0),
+                LineItemBase(product="Bolsa", sku="SKU2", quantity=1, unitPrice=10.0),
+            ]
+        )
 
-            order_service.update_order(mock_db, 1, update_data)
+        order_service.update_order(mock_db, 1, update_data)
 
-            call_args = mock_repo.update.call_args
-            obj_in = call_args.kwargs.get("obj_in", call_args[1].get("obj_in"))
+        call_args = mock_order_repo.update.call_args
+        obj_in = call_args.kwargs.get("obj_in", call_args[1].get("obj_in"))
 
-            # Verify total was recalculated: (2*49) + (1*10) = 108
-            assert obj_in["total_price"] == 108.0
-            # Verify subtotals were added to each item
-            assert obj_in["line_items"][0]["subtotal"] == 98.0
-            assert obj_in["line_items"][1]["subtotal"] == 10.0
+        # Verify total was recalculated: (2*49) + (1*10) = 108
+        assert obj_in["total_price"] == 108.0
+        # Verify subtotals were added to each item
+        assert obj_in["line_items"][0]["subtotal"] == 98.0
+        assert obj_in["line_items"][1]["subtotal"] == 10.0
 
-    def test_update_order_without_line_items_keeps_original_total(self, order_service, mock_db):
+    def test_update_order_without_line_items_keeps_original_total(
+        self, mock_order_repo, order_service, mock_db
+    ):
         """Test: update_order without line_items does NOT recalculate total_price."""
-        from app.schemas.order import OrderUpdate
+        existing_order = SimpleNamespace(id=1)
 
-        existing_order = MagicMock()
-        existing_order.id = 1
+        mock_order_repo.get.return_value = existing_order
+        mock_order_repo.update.return_value = existing_order
 
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get.return_value = existing_order
-            mock_repo.update.return_value = existing_order
+        update_data = OrderUpdate(customer_name="Updated Name")
 
-            update_data = OrderUpdate(customer_name="Updated Name")
+        order_service.update_order(mock_db, 1, update_data)
 
-            order_service.update_order(mock_db, 1, update_data)
+        call_args = mock_order_repo.update.call_args
+        obj_in = call_args.kwargs.get("obj_in", call_args[1].get("obj_in"))
 
-            call_args = mock_repo.update.call_args
-            obj_in = call_args.kwargs.get("obj_in", call_args[1].get("obj_in"))
+        # Should pass the OrderUpdate directly, not a dict with total_price
+        assert not isinstance(obj_in, dict) or "total_price" not in obj_in
 
-            # Should pass the OrderUpdate directly, not a dict with total_price
-            assert not isinstance(obj_in, dict) or "total_price" not in obj_in
-
-    def test_delete_order_not_found_raises_error(self, order_service, mock_db):
+    def test_delete_order_not_found_raises_error(self, mock_order_repo, order_service, mock_db):
         """Test: delete_order raises ValueError when order not found."""
-        with patch("app.services.order.order_repository") as mock_repo:
-            mock_repo.get.return_value = None
-
-            with pytest.raises(ValueError) as exc_info:
-                order_service.delete_order(mock_db, 999)
+        mock_order_repo.get.return_value = None
 
-            assert "not found" in str(exc_info.value)
+        with pytest.raises(ValueError, match="not found"):
+            order_service.delete_order(mock_db, 999)